@@ -0,0 +1,32 @@
+import argparse
+import time
+from recomendation_engine import default_data_path, load_model, recommend_movies_for_all_users, save_recommendations
+
+if __name__ == "__main__":
+    """
+    Batch mode of the recommendation engine.
+
+    Computes recommendations and anti-recommendations for every user of the
+    questionnaire in one vectorized pass and writes them to columnar file
+    (".parquet" or ".npz").
+
+    Usage:
+        python batch_recommend.py --metric cosine --output recommendations.parquet
+    """
+    parser = argparse.ArgumentParser(description="Recommendations for every user")
+    parser.add_argument("--data", default=default_data_path(), help="questionnaire CSV file or ratings store")
+    parser.add_argument("--metric", default="euclidean")
+    parser.add_argument("--clusters", type=int, default=5)
+    parser.add_argument("--top-n", type=int, default=5)
+    parser.add_argument("--sparse", action="store_true", help="use sparse user-movie matrix")
+    parser.add_argument("--output", default="recommendations.parquet", help=".parquet or .npz file")
+    args = parser.parse_args()
+
+    user_movie_matrix, kmeans = load_model(args.data, args.clusters, args.metric, args.sparse)
+    start = time.perf_counter()
+    recommendations, anti_recommendations = recommend_movies_for_all_users(
+        user_movie_matrix, kmeans, args.top_n)
+    elapsed = time.perf_counter() - start
+    save_recommendations(args.output, user_movie_matrix, recommendations, anti_recommendations)
+    print(f"Recommendations for {user_movie_matrix.shape[0]} users written to {args.output} "
+          f"({elapsed:.3f} s)")
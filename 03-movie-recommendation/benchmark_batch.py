@@ -0,0 +1,62 @@
+import argparse
+import time
+import numpy as np
+from synthetic_data import generate_questionnaire
+from recomendation_engine import (parseData, preprocess_data, cluster_users, recommend_movies,
+                                  recommend_movies_for_all_users)
+
+
+def average_ratings(user_movie_matrix, kmeans, user_id, movies):
+    """
+    Returns average rating of given movies in the cluster of the user, used
+    to compare rankings that may order ties differently.
+    """
+    members = kmeans.labels_ == kmeans.labels_[user_id]
+    columns = user_movie_matrix.columns.get_indexer(movies)
+    return user_movie_matrix.iloc[members, columns].mean(axis=0).to_numpy()
+
+
+if __name__ == "__main__":
+    """
+    Compares throughput of `recommend_movies_for_all_users` with calling
+    `recommend_movies` in a loop for every user on synthetic questionnaire.
+    Checks that both give the same ranking of average ratings, exits with
+    error when they differ for any user.
+
+    Usage:
+        python benchmark_batch.py --users 2000 --movies 2000
+    """
+    parser = argparse.ArgumentParser(description="Benchmark of batch recommendations")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--movies", type=int, default=2000)
+    parser.add_argument("--top-n", type=int, default=5)
+    args = parser.parse_args()
+
+    user_movie_matrix = preprocess_data(parseData(generate_questionnaire(args.users, movies=args.movies)))
+    kmeans = cluster_users(user_movie_matrix)
+    movies = user_movie_matrix.columns
+
+    start = time.perf_counter()
+    loop_result = [recommend_movies(user_movie_matrix, kmeans, user_id, args.top_n)
+                   for user_id in range(args.users)]
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    recommendations, anti_recommendations = recommend_movies_for_all_users(
+        user_movie_matrix, kmeans, args.top_n)
+    batch_time = time.perf_counter() - start
+
+    mismatches = []
+    for user_id, (expected, expected_anti) in enumerate(loop_result):
+        for expected_movies, indices in ((expected, recommendations), (expected_anti, anti_recommendations)):
+            batch_movies = movies[indices[user_id][indices[user_id] >= 0]]
+            if not np.array_equal(average_ratings(user_movie_matrix, kmeans, user_id, expected_movies),
+                                  average_ratings(user_movie_matrix, kmeans, user_id, batch_movies)):
+                mismatches.append(user_id)
+                break
+
+    print(f"{'users':>8} {'loop [users/s]':>15} {'batch [users/s]':>16} {'speedup':>8}")
+    print(f"{args.users:>8} {args.users / loop_time:>15.0f} {args.users / batch_time:>16.0f} "
+          f"{loop_time / batch_time:>7.0f}x")
+    if mismatches:
+        raise SystemExit(f"Rankings differ for {len(mismatches)} users: {mismatches[:10]}")
@@ -0,0 +1,54 @@
+import argparse
+import time
+import tracemalloc
+from synthetic_data import generate_questionnaire
+from factorization import fit_factorization, recommend_factorized_movies
+from item_similarity import build_item_index, recommend_similar_movies
+from recomendation_engine import parseData, preprocess_data, cluster_users, recommend_movies
+
+ENGINES = {
+    "kmeans": (cluster_users, recommend_movies,
+               lambda model: model.cluster_centers_.nbytes + model.labels_.nbytes),
+    "svd": (fit_factorization, recommend_factorized_movies,
+            lambda model: model.user_factors.nbytes + model.item_factors.nbytes),
+    "item": (build_item_index, recommend_similar_movies,
+             lambda model: model.neighbours.nbytes + model.similarities.nbytes),
+}
+
+if __name__ == "__main__":
+    """
+    Compares recommendation engines (k-means clusters, low-rank factorization
+    and item similarity index) on the same synthetic questionnaire: fit time,
+    peak memory during fit (traced by `tracemalloc` in a separate fit), size of the fitted model
+    and latency of recommendations for a single user.
+
+    Usage:
+        python benchmark_engines.py --users 5000 --movies 2000
+    """
+    parser = argparse.ArgumentParser(description="Benchmark of recommendation engines")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--movies", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    user_movie_matrix = preprocess_data(
+        parseData(generate_questionnaire(args.users, movies=args.movies)), sparse=True)
+    users = range(0, args.users, max(1, args.users // args.requests))
+
+    print(f"{'engine':>8} {'fit [s]':>8} {'fit peak [MB]':>14} {'model [MB]':>11} {'latency [ms]':>13}")
+    for name, (fit, recommend, model_size) in ENGINES.items():
+        start = time.perf_counter()
+        model = fit(user_movie_matrix)
+        fit_time = time.perf_counter() - start
+        # tracing slows down allocation-heavy code, peak memory is measured in a separate fit
+        tracemalloc.start()
+        fit(user_movie_matrix)
+        fit_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        for user_id in users:
+            recommend(user_movie_matrix, model, user_id)
+        latency = (time.perf_counter() - start) / len(users)
+        print(f"{name:>8} {fit_time:>8.2f} {fit_peak / 2**20:>14.1f} {model_size(model) / 2**20:>11.2f} "
+              f"{latency * 1000:>13.3f}")
@@ -0,0 +1,56 @@
+import argparse
+import os
+import tempfile
+import time
+from fake_tmdb import FakeTMDB, generate_fixtures, start_server
+
+
+def run(get_movies_metadata, titles, max_workers):
+    start = time.perf_counter()
+    results = get_movies_metadata(titles, max_workers)
+    return time.perf_counter() - start, sum(metadata is not None for metadata, _ in results)
+
+
+if __name__ == "__main__":
+    """
+    Benchmark of themoviedb client against local stand-in server (see
+    `fake_tmdb.py`) with fixed latency distribution, error and rate limit
+    rates. For each number of workers reports throughput of cold lookups
+    (empty cache), warm lookups (every response cached), number of titles
+    resolved despite errors and responses by status code.
+
+    Usage:
+        python benchmark_fetcher.py --titles 200 --workers 1 8 16 --latency normal:50,10 --rate-limit-rate 0.1
+    """
+    parser = argparse.ArgumentParser(description="Benchmark of themoviedb client")
+    parser.add_argument("--titles", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--latency", default="normal:50,10", help="latency distribution in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.05)
+    parser.add_argument("--max-rps", type=float)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    titles = [f"Movie {i}" for i in range(args.titles)]
+    fixtures = generate_fixtures(titles, args.seed)
+    cache_directory = tempfile.TemporaryDirectory()
+    # data_fetcher reads its settings on import, the cache must not mix with the real one
+    os.environ["TMDB_CACHE_PATH"] = os.path.join(cache_directory.name, "tmdb_cache.sqlite")
+    os.environ["TMDB_CACHE_MAX_ENTRIES"] = str(4 * args.titles)
+    os.environ.setdefault("TMDB_BACKOFF", "0.05")
+    import data_fetcher
+
+    print(f"{'workers':>8} {'cold [titles/s]':>16} {'warm [titles/s]':>16} {'resolved':>9}  responses")
+    for workers in args.workers:
+        fake = FakeTMDB(fixtures, args.latency, args.error_rate, args.rate_limit_rate, args.max_rps,
+                        retry_after=None, seed=args.seed)
+        server = start_server(fake)
+        data_fetcher.BASE_URL = f"http://127.0.0.1:{server.server_port}/3"
+        data_fetcher.cache.clear()
+        cold_time, resolved = run(data_fetcher.get_movies_metadata, titles, workers)
+        warm_time, _ = run(data_fetcher.get_movies_metadata, titles, workers)
+        server.shutdown()
+        print(f"{workers:>8} {len(titles) / cold_time:>16.1f} {len(titles) / warm_time:>16.1f} "
+              f"{resolved:>9}  {fake.stats()}")
+    cache_directory.cleanup()
@@ -0,0 +1,63 @@
+import argparse
+import time
+import tracemalloc
+from sklearn.cluster import KMeans
+from sklearn.metrics import pairwise_distances
+from synthetic_data import generate_questionnaire
+from recomendation_engine import parseData, preprocess_data, cluster_users
+
+
+def cluster_users_pairwise(user_movie_matrix, n_clusters=5, metric="cosine"):
+    """
+    Previous implementation of non-euclidean metrics - k-means on users x users
+    distance matrix.
+    """
+    dist_matrix = pairwise_distances(user_movie_matrix.matrix, metric=metric)
+    return KMeans(n_clusters=n_clusters, random_state=42).fit(dist_matrix)
+
+
+def measure(function, *args):
+    """
+    Returns run time of the function in seconds and peak memory allocated
+    during the call in MB. Time is measured in a separate call without
+    `tracemalloc`, which slows down allocation-heavy code.
+    """
+    start = time.perf_counter()
+    function(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    function(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+if __name__ == "__main__":
+    """
+    Compares time and peak memory (traced by `tracemalloc`) of clustering with
+    cosine and manhattan metrics with the users x users distance matrix and
+    with scalable implementation of `cluster_users`.
+
+    Usage:
+        python benchmark_metrics.py --users 1000 5000 10000 --pairwise-limit 10000
+    """
+    parser = argparse.ArgumentParser(description="Benchmark of clustering metrics")
+    parser.add_argument("--users", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--movies", type=int, default=1000)
+    parser.add_argument("--pairwise-limit", type=int, default=10000,
+                        help="skip distance matrix implementation above this number of users")
+    args = parser.parse_args()
+
+    print(f"{'metric':>10} {'users':>7} {'pairwise [s]':>13} {'pairwise [MB]':>14} "
+          f"{'scalable [s]':>13} {'scalable [MB]':>14}")
+    for users in args.users:
+        user_movie_matrix = preprocess_data(
+            parseData(generate_questionnaire(users, movies=args.movies)), sparse=True)
+        for metric in ("cosine", "manhattan"):
+            if users <= args.pairwise_limit:
+                pairwise_time, pairwise_peak = measure(cluster_users_pairwise, user_movie_matrix, 5, metric)
+                pairwise = f"{pairwise_time:>13.2f} {pairwise_peak:>14.1f}"
+            else:
+                pairwise = f"{'-':>13} {'-':>14}"
+            scalable_time, scalable_peak = measure(cluster_users, user_movie_matrix, 5, metric)
+            print(f"{metric:>10} {users:>7} {pairwise} {scalable_time:>13.2f} {scalable_peak:>14.1f}")
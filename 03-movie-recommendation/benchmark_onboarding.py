@@ -0,0 +1,38 @@
+import argparse
+import time
+from synthetic_data import generate_questionnaire
+from onboarding import IncrementalClusters
+from recomendation_engine import parseData, preprocess_data, cluster_users
+
+if __name__ == "__main__":
+    """
+    Compares latency of onboarding one new respondent with `IncrementalClusters`
+    and with refitting `cluster_users` on everyone, for growing number of users.
+
+    Usage:
+        python benchmark_onboarding.py --users 1000 5000 20000
+    """
+    parser = argparse.ArgumentParser(description="Benchmark of onboarding new users")
+    parser.add_argument("--users", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--movies", type=int, default=1000)
+    parser.add_argument("--new-users", type=int, default=50)
+    parser.add_argument("--sparse", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'users':>8} {'full refit [ms]':>16} {'onboarding [ms/user]':>21}")
+    for users in args.users:
+        ratings = parseData(generate_questionnaire(users + args.new_users, movies=args.movies))
+        known = ratings["User"].isin(ratings["User"].unique()[:users])
+        user_movie_matrix = preprocess_data(ratings[known], args.sparse)
+
+        start = time.perf_counter()
+        kmeans = cluster_users(user_movie_matrix)
+        refit_time = time.perf_counter() - start
+
+        clusters = IncrementalClusters(user_movie_matrix, kmeans)
+        new_ratings = ratings[~known]
+        start = time.perf_counter()
+        for _, user_ratings in new_ratings.groupby("User", sort=False):
+            clusters.add_users(user_ratings)
+        onboarding_time = (time.perf_counter() - start) / args.new_users
+        print(f"{users:>8} {refit_time * 1000:>16.1f} {onboarding_time * 1000:>21.3f}")
@@ -0,0 +1,52 @@
+import argparse
+import time
+import pandas as pd
+from recomendation_engine import parseData
+from synthetic_data import generate_questionnaire
+
+
+def parse_data_iterrows(data):
+    """
+    Reference row by row implementation of `parseData`, used to check the
+    output of the vectorized parser and to measure the speedup.
+    """
+    parsedData = []
+    for _, row in data.iterrows():
+        user_name = row.iloc[0]
+        movie_rating_pairs = row.iloc[1:]
+
+        for i in range(1, len(movie_rating_pairs), 2):
+            movie = movie_rating_pairs[i]
+            rating = movie_rating_pairs[i + 1]
+
+            if pd.notna(movie) and pd.notna(rating):
+                parsedData.append({"User": user_name, "Movie": movie, "Rating": float(rating)})
+    return pd.DataFrame(parsedData)
+
+
+def measure(function, data):
+    start = time.perf_counter()
+    result = function(data)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    """
+    Compares the vectorized `parseData` with row by row `iterrows` parser on
+    synthetic questionnaires.
+
+    Usage:
+        python benchmark_parser.py --users 10000 100000
+    """
+    parser = argparse.ArgumentParser(description="Benchmark of questionnaire parser")
+    parser.add_argument("--users", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'users':>8} {'ratings':>9} {'iterrows [s]':>13} {'vectorized [s]':>15} {'speedup':>8}")
+    for users in args.users:
+        data = generate_questionnaire(users)
+        expected, loop_time = measure(parse_data_iterrows, data)
+        result, vectorized_time = measure(parseData, data)
+        pd.testing.assert_frame_equal(result, expected)
+        print(f"{users:>8} {len(result):>9} {loop_time:>13.3f} {vectorized_time:>15.3f} "
+              f"{loop_time / vectorized_time:>7.0f}x")
@@ -0,0 +1,140 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import pandas as pd
+from recomendation_engine import parseData, preprocess_data, cluster_users, recommend_movies
+from synthetic_data import generate_questionnaire, write_questionnaire
+
+
+def measure(function, *args):
+    """
+    Calls function and returns its result, run time in seconds and peak
+    memory allocated during the call (traced by `tracemalloc`) in MB.
+
+    Tracing slows down allocation-heavy code, so time is measured in a
+    separate untraced call and the function is called twice.
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    function(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+def read_questionnaire(path):
+    return pd.read_csv(path, header=None)
+
+
+def recommend_sample(user_movie_matrix, kmeans, users):
+    for user_id in users:
+        recommend_movies(user_movie_matrix, kmeans, user_id)
+
+
+def run_benchmark(users, movies, metric, sparse, path, recommendations=100):
+    """
+    Runs every stage of the recommendation pipeline on questionnaire stored
+    in `path` and returns list of measurements of the stages.
+    """
+    results = []
+
+    def stage(name, function, *args, calls=1):
+        result, seconds, peak = measure(function, *args)
+        results.append({
+            "users": users, "movies": movies, "metric": metric, "sparse": sparse, "stage": name,
+            "seconds": seconds / calls, "peak_mb": peak
+        })
+        return result
+
+    data = stage("read_csv", read_questionnaire, path)
+    parsed_data = stage("parseData", parseData, data)
+    user_movie_matrix = stage("preprocess_data", preprocess_data, parsed_data, sparse)
+    kmeans = stage("cluster_users", cluster_users, user_movie_matrix, 5, metric)
+    sample = range(0, users, max(1, users // recommendations))
+    stage("recommend_movies", recommend_sample, user_movie_matrix, kmeans, sample, calls=len(sample))
+    return results
+
+
+def find_regressions(results, baseline, tolerance, min_seconds=0.01):
+    """
+    Compares results with baseline measurements of the same configuration
+    and stage. Measurement is a regression when its time or peak memory is
+    higher than baseline by more than `tolerance` (e.g. 0.2 for 20%). Time
+    differences below `min_seconds` are ignored as noise.
+    """
+    def key(result):
+        return tuple(result[name] for name in ("users", "movies", "metric", "sparse", "stage"))
+
+    previous = {key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+        if (result["seconds"] > old["seconds"] * (1 + tolerance)
+                and result["seconds"] - old["seconds"] > min_seconds):
+            regressions.append((result, "seconds", old["seconds"]))
+        if result["peak_mb"] > old["peak_mb"] * (1 + tolerance) and result["peak_mb"] - old["peak_mb"] > 1:
+            regressions.append((result, "peak_mb", old["peak_mb"]))
+    return regressions
+
+
+if __name__ == "__main__":
+    """
+    Benchmark suite of the recommendation pipeline. For each size of synthetic
+    questionnaire (see `synthetic_data.py`) and each metric, times and
+    memory-profiles reading the CSV, `parseData`, `preprocess_data`,
+    `cluster_users` and `recommend_movies` (per call). Results are saved as
+    JSON and compared with stored baseline - regressions are printed and the
+    script exits with status 1.
+
+    Usage:
+        python benchmark_pipeline.py --users 1000 10000 --save-baseline
+        python benchmark_pipeline.py --users 1000 10000
+    """
+    parser = argparse.ArgumentParser(description="Benchmark of the recommendation pipeline")
+    parser.add_argument("--users", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--movies", type=int, default=2000)
+    parser.add_argument("--metrics", nargs="+", default=["euclidean", "cosine", "manhattan"])
+    parser.add_argument("--sparse", action="store_true", help="use sparse user-movie matrix")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", default="benchmark_baseline.json")
+    parser.add_argument("--save-baseline", action="store_true", help="store results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown, 0.2 means 20%%")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'users':>7} {'metric':>10} {'stage':>17} {'time [s]':>10} {'peak [MB]':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for users in args.users:
+            path = os.path.join(directory, f"questionnaire_{users}.csv")
+            write_questionnaire(path, generate_questionnaire(users, args.movies))
+            for metric in args.metrics:
+                for result in run_benchmark(users, args.movies, metric, args.sparse, path):
+                    results.append(result)
+                    print(f"{users:>7} {metric:>10} {result['stage']:>17} {result['seconds']:>10.4f} "
+                          f"{result['peak_mb']:>10.1f}")
+
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Baseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            regressions = find_regressions(results, json.load(file), args.tolerance)
+        for result, measurement, old in regressions:
+            print(f"REGRESSION {result['stage']} ({result['users']} users, {result['metric']}): "
+                  f"{measurement} {old:.4f} -> {result[measurement]:.4f}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline")
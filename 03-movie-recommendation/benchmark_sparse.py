@@ -0,0 +1,117 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from scipy import sparse as sp
+from sklearn.metrics import adjusted_rand_score, pairwise_distances
+from synthetic_data import generate_questionnaire
+from recomendation_engine import (parseData, preprocess_data, cluster_users, recommend_movies,
+                                  recommend_movies_for_all_users, user_features, canonical_metric)
+
+
+def matrix_memory(user_movie_matrix):
+    """
+    Returns number of bytes used by values of dense or sparse user-movie matrix.
+    """
+    if isinstance(user_movie_matrix, pd.DataFrame):
+        return user_movie_matrix.memory_usage(index=False).sum()
+    matrix = user_movie_matrix.matrix
+    return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+
+
+def cluster_means(user_movie_matrix, labels):
+    """
+    Returns mean ratings of members of every cluster, shape (n_clusters, n_movies).
+    """
+    if isinstance(user_movie_matrix, pd.DataFrame):
+        matrix = user_movie_matrix.to_numpy(dtype=float)
+    else:
+        matrix = user_movie_matrix.matrix
+    means = []
+    for cluster in range(labels.max() + 1):
+        mean = matrix[labels == cluster].mean(axis=0)
+        means.append(np.asarray(mean).ravel() if sp.issparse(matrix) else mean)
+    return np.array(means)
+
+
+def check_parity(dense, sparse, kmeans, metric, users_to_check):
+    """
+    Compares dense and sparse backends with the same clustering model (fitted
+    on the dense matrix) - matrices, cluster assignment of users, mean ratings
+    of clusters, recommendations of the sampled users and recommendations and
+    anti-recommendations of every user.
+
+    Returns:
+        list: Descriptions of differences, empty when the backends agree.
+    """
+    if not (dense.index.equals(pd.Index(sparse.index)) and dense.columns.equals(pd.Index(sparse.columns))):
+        return ["users or movies differ"]
+    if not np.array_equal(dense.to_numpy(dtype=float), sparse.matrix.toarray()):
+        return ["ratings differ"]
+    differences = []
+    features = user_features(sparse, metric)
+    if canonical_metric(metric) not in ("euclidean", "cosine", "manhattan"):
+        features = pairwise_distances(features.toarray() if sp.issparse(features) else features, metric=metric)
+    labels = kmeans.predict(features)
+    if not np.array_equal(labels, kmeans.labels_):
+        differences.append(f"cluster of {np.sum(labels != kmeans.labels_)} users differ")
+    if not np.allclose(cluster_means(dense, kmeans.labels_), cluster_means(sparse, kmeans.labels_)):
+        differences.append("cluster means differ")
+    if any(recommend_movies(dense, kmeans, user_id) != recommend_movies(sparse, kmeans, user_id)
+           for user_id in users_to_check):
+        differences.append("recommendations of sampled users differ")
+    movies = np.asarray(dense.columns)
+    for kind, dense_indices, sparse_indices in zip(
+            ("recommendations", "anti-recommendations"),
+            recommend_movies_for_all_users(dense, kmeans),
+            recommend_movies_for_all_users(sparse, kmeans)):
+        same = np.where(dense_indices >= 0, movies[dense_indices], None) == \
+            np.where(sparse_indices >= 0, movies[sparse_indices], None)
+        if not same.all():
+            differences.append(f"{kind} of {np.sum(~same.all(axis=1))} users differ")
+    return differences
+
+
+def run_pipeline(parsed_data, sparse, metric, users_to_check):
+    start = time.perf_counter()
+    user_movie_matrix = preprocess_data(parsed_data, sparse)
+    kmeans = cluster_users(user_movie_matrix, 5, metric)
+    recommendations = [recommend_movies(user_movie_matrix, kmeans, user_id) for user_id in users_to_check]
+    return user_movie_matrix, kmeans, recommendations, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    """
+    Compares dense and sparse user-movie matrix backends on synthetic
+    questionnaires. Checks that both backends give the same clusters and
+    recommendations (see `check_parity`), then reports memory used by the
+    matrix and run time. Exits with error when the backends differ.
+    K-means fitted independently on dense and sparse input may converge to
+    different clusters (floating point operations differ), their agreement
+    is reported as adjusted Rand index.
+
+    Usage:
+        python benchmark_sparse.py --users 1000 10000 --movies 5000
+    """
+    parser = argparse.ArgumentParser(description="Benchmark of sparse user-movie matrix")
+    parser.add_argument("--users", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--movies", type=int, default=5000)
+    parser.add_argument("--metric", default="euclidean")
+    args = parser.parse_args()
+
+    print(f"{'users':>8} {'dense [MB]':>11} {'sparse [MB]':>12} {'dense [s]':>10} {'sparse [s]':>11} "
+          f"{'ARI':>6}")
+    for users in args.users:
+        parsed_data = parseData(generate_questionnaire(users, movies=args.movies))
+        users_to_check = range(0, users, max(1, users // 100))
+        dense, dense_kmeans, dense_result, dense_time = run_pipeline(
+            parsed_data, False, args.metric, users_to_check)
+        sparse, sparse_kmeans, sparse_result, sparse_time = run_pipeline(
+            parsed_data, True, args.metric, users_to_check)
+
+        differences = check_parity(dense, sparse, dense_kmeans, args.metric, users_to_check)
+        if differences:
+            raise SystemExit(f"Dense and sparse backends differ for {users} users: {', '.join(differences)}")
+        print(f"{users:>8} {matrix_memory(dense) / 2**20:>11.1f} {matrix_memory(sparse) / 2**20:>12.1f} "
+              f"{dense_time:>10.2f} {sparse_time:>11.2f} "
+              f"{adjusted_rand_score(dense_kmeans.labels_, sparse_kmeans.labels_):>6.3f}")
@@ -1,12 +1,104 @@
 import requests
 import pandas as pd
 import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from tmdb_cache import TMDBCache, MISSING
 
 load_dotenv()
 
 API_KEY = os.getenv('API_KEY')
-BASE_URL = 'https://api.themoviedb.org/3'
+BASE_URL = os.getenv('TMDB_BASE_URL', 'https://api.themoviedb.org/3')
+LANGUAGE = 'pl-PL'
+MAX_WORKERS = int(os.getenv('TMDB_MAX_WORKERS', 8))
+REQUEST_TIMEOUT = float(os.getenv('TMDB_REQUEST_TIMEOUT', 5))
+MAX_RETRIES = int(os.getenv('TMDB_MAX_RETRIES', 5))
+BACKOFF = float(os.getenv('TMDB_BACKOFF', 0.5))
+
+# Shared session keeps connections alive, so each request doesn't pay for new TCP/TLS handshake
+session = requests.Session()
+session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS))
+session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS))
+
+cache = TMDBCache(
+    os.getenv('TMDB_CACHE_PATH', 'cache/tmdb_cache.sqlite'),
+    ttl=float(os.getenv('TMDB_CACHE_TTL', 7 * 24 * 3600)),
+    max_entries=int(os.getenv('TMDB_CACHE_MAX_ENTRIES', 10000)),
+    memory_entries=int(os.getenv('TMDB_CACHE_MEMORY_ENTRIES', 256))
+)
+
+def cache_stats():
+    """
+    Returns hit and miss counters of the themoviedb response cache.
+
+    Returns:
+        dict: Counters of memory hits, disk hits, misses and number of stored
+        entries.
+    """
+    return cache.stats()
+
+def request_json(path, params=None):
+    """
+    Sends GET request to the themoviedb endpoint and returns decoded response.
+
+    When the API answers with 429 (rate limit exceeded), the request is
+    retried up to `MAX_RETRIES` times. Before each retry it waits for the time
+    given in `Retry-After` header or, without the header, for exponentially
+    growing time (`BACKOFF` * 2^attempt) with random jitter.
+
+    Args:
+        path (str): Endpoint path relative to `BASE_URL`, e.g. "search/multi".
+        params (dict, default=None): Query parameters, API key and language
+        are added.
+
+    Returns:
+        dict: Decoded JSON response.
+
+    Raises:
+        requests.RequestException: If the request fails or retries are exhausted.
+    """
+    params = {'api_key': API_KEY, 'language': LANGUAGE, **(params or {})}
+    for attempt in range(MAX_RETRIES + 1):
+        response = session.get(f"{BASE_URL}/{path}", params=params, timeout=REQUEST_TIMEOUT)
+        if response.status_code != 429 or attempt == MAX_RETRIES:
+            response.raise_for_status()
+            return response.json()
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            delay = float(retry_after)
+        else:
+            delay = BACKOFF * 2 ** attempt * (1 + random.random())
+        time.sleep(delay)
+
+def fetch_movie_object(title):
+    """
+    Same as `get_movie_object`, but raises exception when the request fails,
+    so callers can tell failed lookup from title without match.
+    """
+    cache_key = ('search/multi', title, LANGUAGE)
+    cached = cache.get(cache_key, MISSING)
+    if cached is not MISSING:
+        return cached
+    search_results = request_json('search/multi', {'query': title})
+    movie_object = search_results['results'][0] if search_results['results'] else None
+    cache.set(cache_key, movie_object)
+    return movie_object
+
+def fetch_movie_genres(movie_id, media_type):
+    """
+    Same as `get_movie_genres`, but raises exception when the request fails.
+    """
+    cache_key = (media_type, movie_id, LANGUAGE)
+    cached = cache.get(cache_key, MISSING)
+    if cached is not MISSING:
+        return cached
+    movie_details = request_json(f"{media_type}/{movie_id}")
+    genres = [genre['name'] for genre in movie_details.get('genres', [])]
+    cache.set(cache_key, genres)
+    return genres
 
 def get_movie_object(title):
     """
@@ -18,6 +110,9 @@ def get_movie_object(title):
     and retrieves the search results. Returns first of search if avaliable.
     Authentication by API_KEY
 
+    Results are cached (see `TMDBCache`) by query and language, so repeated
+    lookups of the same title don't hit the network.
+
     Args:
         title (str): The title of the movie or TV show to search for.
 
@@ -59,20 +154,7 @@ def get_movie_object(title):
         
     """
     try:
-        search_url = f"{BASE_URL}/search/multi"
-        params = {
-            'api_key': API_KEY,
-            'query': title,
-            'language': 'pl-PL'
-        }
-        response = requests.get(search_url, params=params)
-        response.raise_for_status()
-        search_results = response.json()
-
-        if search_results['results']:
-            return search_results['results'][0]
-        else:
-            return None
+        return fetch_movie_object(title)
     except Exception as e:
         print(f"Error fetching data for {title}: {e}")
         return None
@@ -86,8 +168,11 @@ def get_movie_genres(movie_id, media_type):
     and retrieves the search results. Returns genres
     of movie if avaliable. Authentication by API_KEY
 
+    Genres are cached (see `TMDBCache`) by media type, id and language.
+
     Args:
-        title (str): The title of the movie or TV show to search for.
+        movie_id (int): The themoviedb id of the movie or TV show.
+        media_type (str): Type of the media - "movie" or "tv".
 
     Returns:
         list of str: List containing each genre
@@ -96,22 +181,50 @@ def get_movie_genres(movie_id, media_type):
         Prints an error message if the request fails or an exception occurs during the process.
 
     Example:
-        >>> fetch_movie_genres("Whiplash")
+        >>> get_movie_genres(244786, "movie")
         ["Dramat, Muzyczny"]
         
     """
     try:
-        details_url = f"{BASE_URL}/{media_type}/{movie_id}"
-        details_params = {
-            'api_key': API_KEY,
-            'language': 'pl-PL'
-        }
-        details_response = requests.get(details_url, params=details_params)
-        details_response.raise_for_status()
-        movie_details = details_response.json()
-
-        genres = [genre['name'] for genre in movie_details.get('genres', [])]
-        return genres
+        return fetch_movie_genres(movie_id, media_type)
     except Exception as e:
-        print(f"Error fetching data for {title}: {e}")
+        print(f"Error fetching data for {media_type}/{movie_id}: {e}")
+        return []
+
+def get_movie_metadata(title):
+    """
+    Fetches movie or TV show object together with its genres.
+
+    Args:
+        title (str): The title of the movie or TV show to search for.
+
+    Returns:
+        tuple: Movie object (dict or `None` if not found) and list of genres.
+    """
+    metadata = get_movie_object(title)
+    if metadata is None:
+        return None, []
+    return metadata, get_movie_genres(metadata['id'], metadata['media_type'])
+
+def get_movies_metadata(titles, max_workers=MAX_WORKERS):
+    """
+    Fetches metadata and genres of many titles concurrently.
+
+    Lookups of different titles run in parallel on bounded thread pool, which
+    shares one keep-alive session, so fetching N titles takes about as long
+    as fetching a single one (search and details request) instead of 2N
+    sequential requests. Every request is limited by `REQUEST_TIMEOUT`.
+
+    Args:
+        titles (list of str): Titles of movies or TV shows to search for.
+        max_workers (int, default=MAX_WORKERS): Maximum number of concurrent
+        lookups.
+
+    Returns:
+        list of tuple: Movie object and list of genres for each title, in the
+        same order as `titles`.
+    """
+    if not titles:
         return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(titles))) as executor:
+        return list(executor.map(get_movie_metadata, titles))
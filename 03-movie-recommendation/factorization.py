@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import TruncatedSVD
+from item_similarity import ratings_matrix, user_ratings
+
+
+class MatrixFactorization:
+    """
+    Low-rank factorization of the user-movie matrix.
+
+    Ratings are approximated by product of user embeddings and movie
+    embeddings of rank k, so predicted ratings of a user are one
+    k-dimensional matrix-vector product.
+
+    Attributes:
+        movies (pandas.Index): Movie titles, positions match columns of the
+        user-movie matrix.
+        user_factors (numpy.ndarray): float32 array of shape (n_users, k).
+        item_factors (numpy.ndarray): float32 array of shape (n_movies, k).
+    """
+
+    def __init__(self, movies, user_factors, item_factors):
+        self.movies = movies
+        self.user_factors = user_factors
+        self.item_factors = item_factors
+
+    def scores(self, user_id):
+        """
+        Returns predicted ratings of all movies for the user.
+        """
+        return self.item_factors @ self.user_factors[user_id]
+
+
+def fit_factorization(user_movie_matrix, rank=20, random_state=42):
+    """
+    Factorizes the user-movie matrix with truncated SVD.
+
+    Truncated SVD works directly on the sparse rating matrix (not rated
+    movies are zeros) and keeps only `rank` strongest components.
+
+    Args:
+        user_movie_matrix (pandas.DataFrame or SparseUserMovieMatrix): Ratings
+        of users, 0 means not rated.
+        rank (int, default=20): Number of dimensions of the embeddings,
+        limited to number of users and movies - 1.
+        random_state (int, default=42): Seed of randomized SVD solver.
+
+    Returns:
+        MatrixFactorization: Fitted embeddings.
+    """
+    matrix = ratings_matrix(user_movie_matrix)
+    rank = max(1, min(rank, min(matrix.shape) - 1))
+    svd = TruncatedSVD(n_components=rank, random_state=random_state)
+    user_factors = svd.fit_transform(matrix)
+    return MatrixFactorization(
+        pd.Index(user_movie_matrix.columns),
+        user_factors.astype(np.float32),
+        svd.components_.T.astype(np.float32)
+    )
+
+
+def recommend_factorized_movies(user_movie_matrix, model, user_id, top_n=5):
+    """
+    Generate recommendations and anti-recommendations for a user from ratings
+    predicted by the factorization.
+
+    Args:
+        user_movie_matrix (pandas.DataFrame or SparseUserMovieMatrix): Ratings
+        of users, 0 means not rated.
+        model (MatrixFactorization): Model fitted by `fit_factorization`.
+        user_id (int): The index of the user in the `user_movie_matrix`.
+        top_n (int, default=5): The number of top recommendations and
+        anti-recommendations to return.
+
+    Returns:
+        recommendations (list) : Titles of unseen movies with the highest
+        predicted rating.
+        anti_recommendations (list) : Titles of unseen movies with the lowest
+        predicted rating.
+    """
+    scores = model.scores(user_id)
+    unseen = np.ones(len(scores), dtype=bool)
+    unseen[user_ratings(user_movie_matrix, user_id)[0]] = False
+    candidates = np.flatnonzero(unseen)
+    top_n = min(top_n, len(candidates))
+    if top_n == 0:
+        return [], []
+
+    candidate_scores = scores[candidates]
+    best = np.argpartition(-candidate_scores, top_n - 1)[:top_n]
+    best = best[np.argsort(-candidate_scores[best], kind="stable")]
+    worst = np.argpartition(candidate_scores, top_n - 1)[:top_n]
+    worst = worst[np.argsort(candidate_scores[worst], kind="stable")]
+    return model.movies[candidates[best]].tolist(), model.movies[candidates[worst]].tolist()
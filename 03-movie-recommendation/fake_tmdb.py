@@ -0,0 +1,236 @@
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+GENRES = ["Akcja", "Animacja", "Dramat", "Fantasy", "Horror", "Komedia", "Kryminał", "Muzyczny", "Romans",
+          "Sci-Fi", "Thriller"]
+
+
+def generate_fixtures(titles, seed=42):
+    """
+    Generates fixture data for every title - one search result and details
+    with 1-3 genres. Every fourth title is a TV show.
+
+    Returns:
+        dict: Fixtures with "search" (query to list of results) and
+        "details" ("{media_type}/{id}" to details) dictionaries.
+    """
+    rng = random.Random(seed)
+    fixtures = {"search": {}, "details": {}}
+    for i, title in enumerate(titles):
+        movie_id = 1000 + i
+        media_type = "tv" if i % 4 == 0 else "movie"
+        genres = [{"id": GENRES.index(name), "name": name} for name in rng.sample(GENRES, rng.randint(1, 3))]
+        name_key = "name" if media_type == "tv" else "title"
+        fixtures["search"][title] = [{
+            "id": movie_id,
+            "media_type": media_type,
+            name_key: title,
+            "overview": f"Opis: {title}",
+            "genre_ids": [genre["id"] for genre in genres]
+        }]
+        fixtures["details"][f"{media_type}/{movie_id}"] = {
+            "id": movie_id,
+            name_key: title,
+            "overview": f"Opis: {title}",
+            "genres": genres
+        }
+    return fixtures
+
+
+def parse_latency(spec):
+    """
+    Parses latency distribution given in milliseconds and returns function
+    sampling latency in seconds from random generator.
+
+    Supported distributions:
+        "constant:50", "uniform:20,80", "normal:50,10" (mean, standard
+        deviation) and "lognormal:50,0.5" (median, sigma). Samples are never
+        negative.
+    """
+    name, _, values = spec.partition(":")
+    params = [float(value) for value in values.split(",")] if values else []
+    if name == "constant" and len(params) == 1:
+        return lambda rng: params[0] / 1000
+    if name == "uniform" and len(params) == 2:
+        return lambda rng: rng.uniform(*params) / 1000
+    if name == "normal" and len(params) == 2:
+        return lambda rng: max(0.0, rng.gauss(*params)) / 1000
+    if name == "lognormal" and len(params) == 2:
+        return lambda rng: params[0] * rng.lognormvariate(0, params[1]) / 1000
+    raise ValueError(f"Invalid latency distribution: {spec}")
+
+
+class FakeTMDB:
+    """
+    Stand-in of themoviedb API answering `search/multi` and
+    `{media_type}/{id}` requests from fixture data.
+
+    Every response is delayed by latency drawn from the distribution. Given
+    fraction of requests fails with 500 or is rejected with 429, and with
+    `max_rps` requests above the limit (token bucket of one second) are
+    rejected with 429 as well. Random decisions come from generator with
+    fixed seed, so runs with the same sequence of requests are repeatable.
+
+    Args:
+        fixtures (dict): Fixtures as returned by `generate_fixtures`.
+        latency (str, default="constant:0"): Latency distribution, see
+        `parse_latency`.
+        error_rate (float, default=0): Fraction of requests answered with 500.
+        rate_limit_rate (float, default=0): Fraction of requests answered with 429.
+        max_rps (float, default=None): Maximal number of requests per second.
+        retry_after (int, default=1): Value of `Retry-After` header of 429
+        responses, no header when `None`.
+        seed (int, default=42): Seed of random generator.
+    """
+
+    def __init__(self, fixtures, latency="constant:0", error_rate=0.0, rate_limit_rate=0.0, max_rps=None,
+                 retry_after=1, seed=42):
+        self.search = fixtures["search"]
+        self.search_lower = {query.lower(): results for query, results in fixtures["search"].items()}
+        self.details = fixtures["details"]
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.max_rps = max_rps
+        self.retry_after = retry_after
+        self.responses = Counter()
+        self._rng = random.Random(seed)
+        self._tokens = max_rps
+        self._refilled_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def respond(self, path, query):
+        """
+        Returns status, JSON body and headers of the response to the request,
+        after waiting for the drawn latency.
+        """
+        with self._lock:
+            delay = self.latency(self._rng)
+            draw = self._rng.random()
+            limited = not self._take_token()
+        time.sleep(delay)
+
+        if limited or draw < self.rate_limit_rate:
+            status, body = 429, {"status_code": 25, "status_message": "Your request count is over the allowed limit."}
+            headers = {"Retry-After": str(self.retry_after)} if self.retry_after is not None else {}
+        elif draw < self.rate_limit_rate + self.error_rate:
+            status, body, headers = 500, {"status_code": 11, "status_message": "Internal error."}, {}
+        else:
+            status, body = self._lookup(path.strip("/"), query)
+            headers = {}
+        with self._lock:
+            self.responses[status] += 1
+        return status, body, headers
+
+    def stats(self):
+        """
+        Returns number of responses by status code.
+        """
+        with self._lock:
+            return {str(status): count for status, count in sorted(self.responses.items())}
+
+    def _lookup(self, path, query):
+        if path.endswith("search/multi"):
+            title = query.get("query", "")
+            results = self.search.get(title, self.search_lower.get(title.lower(), []))
+            return 200, {"page": 1, "results": results, "total_pages": 1, "total_results": len(results)}
+        details = self.details.get("/".join(path.split("/")[-2:]))
+        if details is None:
+            return 404, {"status_code": 34, "status_message": "The resource you requested could not be found."}
+        return 200, details
+
+    def _take_token(self):
+        if self.max_rps is None:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self.max_rps, self._tokens + (now - self._refilled_at) * self.max_rps)
+        self._refilled_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+def create_handler(fake):
+    class FakeTMDBHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/stats":
+                status, body, headers = 200, fake.stats(), {}
+            else:
+                query = {name: values[0] for name, values in parse_qs(url.query).items()}
+                status, body, headers = fake.respond(url.path, query)
+            content = json.dumps(body, ensure_ascii=False).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(content)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FakeTMDBHandler
+
+
+def start_server(fake, host="127.0.0.1", port=0):
+    """
+    Starts server of `fake` in background thread and returns it. Port 0
+    picks a free port, base URL for `TMDB_BASE_URL` is
+    `http://{host}:{server.server_port}/3`.
+    """
+    server = ThreadingHTTPServer((host, port), create_handler(fake))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    """
+    Local stand-in of themoviedb API. Fixtures are read from JSON file or
+    generated for every title of the questionnaire. Point the fetcher at it
+    with `TMDB_BASE_URL=http://127.0.0.1:8001/3`.
+
+    Usage:
+        python fake_tmdb.py --port 8001 --latency lognormal:80,0.5 --error-rate 0.01 --rate-limit-rate 0.05
+        python fake_tmdb.py --save-fixtures resources/tmdb_fixtures.json
+    """
+    parser = argparse.ArgumentParser(description="Local stand-in of themoviedb API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--fixtures", help="JSON fixtures file, generated from questionnaire titles by default")
+    parser.add_argument("--save-fixtures", help="write generated fixtures to file and exit")
+    parser.add_argument("--latency", default="constant:0", help="latency distribution in ms, e.g. normal:50,10")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 500 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of 429 responses")
+    parser.add_argument("--max-rps", type=float, help="requests per second above which 429 is returned")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After of 429 responses in seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.fixtures:
+        with open(args.fixtures, encoding="utf-8") as file:
+            fixtures = json.load(file)
+    else:
+        from recomendation_engine import default_data_path, load_ratings
+        fixtures = generate_fixtures(load_ratings(default_data_path(), ["Movie"])["Movie"].unique(), args.seed)
+    if args.save_fixtures:
+        with open(args.save_fixtures, "w", encoding="utf-8") as file:
+            json.dump(fixtures, file, ensure_ascii=False, indent=1)
+        print(f"Fixtures of {len(fixtures['search'])} titles written to {args.save_fixtures}")
+    else:
+        fake = FakeTMDB(fixtures, args.latency, args.error_rate, args.rate_limit_rate, args.max_rps,
+                        args.retry_after, args.seed)
+        server = ThreadingHTTPServer((args.host, args.port), create_handler(fake))
+        print(f"Serving fake themoviedb API on http://{args.host}:{args.port}/3")
+        server.serve_forever()
@@ -1,3 +1,4 @@
+import sys
 from recomendation_engine import getRecomendations
 from user_input import showRecomended, showNotRecomended
 
@@ -10,7 +11,11 @@ if __name__ == "__main__":
     and displays them.
 
     It uses argv parameters that let select metric by user that is used in
-    recommendation engine
+    recommendation engine. `--sparse` flag switches the engine to sparse
+    user-movie matrix, `--engine=item` recommends movies similar to the ones
+    rated by user and `--engine=svd` movies with the highest ratings
+    predicted by matrix factorization, instead of the ones liked in user's
+    cluster. `--clusters=N` sets number of clusters (5 by default).
 
     1. The script runs in a loop, asking the user to input their user ID.
     2. If the input is not a valid integer, it displays an error message and prompts again.
@@ -22,6 +27,8 @@ if __name__ == "__main__":
     4. The script terminates after successfully displaying the results.
     """
     user_id = int(input("Podaj swoje id w bazie obejrzanych filmów: "))
-    data = getRecomendations(user_id)
+    engine = next((argument.split("=", 1)[1] for argument in sys.argv if argument.startswith("--engine=")), "kmeans")
+    n_clusters = next((int(argument.split("=", 1)[1]) for argument in sys.argv if argument.startswith("--clusters=")), 5)
+    data = getRecomendations(user_id, sparse="--sparse" in sys.argv, engine=engine, n_clusters=n_clusters)
     showRecomended(data['recomendations'])
     showNotRecomended(data['anti-recommendations'])
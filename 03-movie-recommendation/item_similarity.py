@@ -0,0 +1,189 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from scipy import sparse as sp
+from sklearn.preprocessing import normalize
+
+
+def ratings_matrix(user_movie_matrix):
+    """
+    Returns ratings of dense or sparse user-movie matrix as CSR matrix.
+    """
+    if isinstance(user_movie_matrix, pd.DataFrame):
+        return sp.csr_matrix(user_movie_matrix.to_numpy(dtype=float))
+    if sp.issparse(user_movie_matrix):
+        return sp.csr_matrix(user_movie_matrix)
+    return user_movie_matrix.matrix
+
+
+def user_ratings(user_movie_matrix, user_id):
+    """
+    Returns sorted column indices of movies rated by the user and the ratings.
+    """
+    if isinstance(user_movie_matrix, pd.DataFrame):
+        row = user_movie_matrix.iloc[user_id].to_numpy(dtype=float)
+        movie_indices = np.flatnonzero(row)
+        return movie_indices, row[movie_indices]
+    row = ratings_matrix(user_movie_matrix)[user_id]
+    return row.indices, row.data
+
+
+class ItemSimilarityIndex:
+    """
+    Index of the most similar movies for every movie.
+
+    Similarity of two movies is cosine similarity of their rating columns
+    (users who rated them). Only `top_k` neighbours of each movie are kept,
+    in two arrays of shape (n_movies, top_k) - `neighbours` with column
+    indices of similar movies and `similarities` with their similarity - so
+    the index is compact and can be memory-mapped when loaded with
+    `joblib.load(..., mmap_mode="r")`.
+
+    Attributes:
+        movies (pandas.Index): Movie titles, positions match columns of the
+        user-movie matrix.
+        neighbours (numpy.ndarray): int32 indices of similar movies.
+        similarities (numpy.ndarray): float32 similarities of the neighbours.
+    """
+
+    def __init__(self, movies, neighbours, similarities):
+        self.movies = movies
+        self.neighbours = neighbours
+        self.similarities = similarities
+
+    def scores(self, movie_indices, ratings):
+        """
+        Scores movies similar to the rated ones.
+
+        Ratings are centered around mean rating of the user, so similarity to
+        liked movies raises the score and similarity to disliked ones lowers
+        it. Only neighbours of rated movies are gathered and summed, so the
+        cost depends on number of ratings and `top_k`, not on catalog size.
+
+        Args:
+            movie_indices (numpy.ndarray): Sorted column indices of rated movies.
+            ratings (numpy.ndarray): Ratings of these movies.
+
+        Returns:
+            tuple: Indices of scored (not rated) movies, their scores and
+            for each of them index of the rated movie with the largest
+            (absolute) contribution.
+        """
+        weights = ratings - ratings.mean()
+        if not weights.any():
+            weights = ratings
+        contributions = self.similarities[movie_indices] * weights[:, None]
+        neighbours = self.neighbours[movie_indices].ravel()
+        candidates, inverse = np.unique(neighbours, return_inverse=True)
+        scores = np.bincount(inverse, weights=contributions.ravel(), minlength=len(candidates))
+
+        flat_contributions = contributions.ravel()
+        sources = np.repeat(movie_indices, self.neighbours.shape[1])
+        order = np.lexsort((-np.abs(flat_contributions), inverse))
+        first = order[np.r_[True, inverse[order][1:] != inverse[order][:-1]]]
+        best_source = sources[first]
+
+        positions = np.minimum(np.searchsorted(movie_indices, candidates), len(movie_indices) - 1)
+        unseen = movie_indices[positions] != candidates
+        return candidates[unseen], scores[unseen], best_source[unseen]
+
+
+def build_item_index(user_movie_matrix, top_k=20, chunk_size=None):
+    """
+    Builds `ItemSimilarityIndex` from the user-movie matrix.
+
+    Similarities are computed for blocks of movies at once (sparse product of
+    normalised columns), so only `chunk_size` x n_movies similarities are
+    kept in memory.
+
+    Args:
+        user_movie_matrix (pandas.DataFrame or SparseUserMovieMatrix): Ratings
+        of users, 0 means not rated.
+        top_k (int, default=20): Number of neighbours kept for each movie.
+        chunk_size (int, default=None): Number of movies processed at once,
+        by default chosen so that a block has ~4M elements.
+
+    Returns:
+        ItemSimilarityIndex: The index.
+    """
+    columns = normalize(ratings_matrix(user_movie_matrix), axis=0).tocsc()
+    n_movies = columns.shape[1]
+    top_k = max(0, min(top_k, n_movies - 1))
+    if chunk_size is None:
+        chunk_size = max(1, (1 << 22) // max(n_movies, 1))
+
+    neighbours = np.zeros((n_movies, top_k), dtype=np.int32)
+    similarities = np.zeros((n_movies, top_k), dtype=np.float32)
+    for start in range(0, n_movies if top_k else 0, chunk_size):
+        block = (columns[:, start:start + chunk_size].T @ columns).toarray()
+        block[np.arange(block.shape[0]), np.arange(start, start + block.shape[0])] = -np.inf
+        top = np.argpartition(-block, top_k - 1, axis=1)[:, :top_k]
+        neighbours[start:start + chunk_size] = top
+        similarities[start:start + chunk_size] = np.take_along_axis(block, top, axis=1)
+    return ItemSimilarityIndex(pd.Index(user_movie_matrix.columns), neighbours, similarities)
+
+
+def recommend_similar_movies(user_movie_matrix, item_index, user_id, top_n=5):
+    """
+    Generate recommendations and anti-recommendations for a user from movies
+    similar to the ones the user rated ("because you liked X").
+
+    Args:
+        user_movie_matrix (pandas.DataFrame or SparseUserMovieMatrix): Ratings
+        of users, 0 means not rated.
+        item_index (ItemSimilarityIndex): Index built by `build_item_index`.
+        user_id (int): The index of the user in the `user_movie_matrix`.
+        top_n (int, default=5): The number of top recommendations and
+        anti-recommendations to return.
+
+    Returns:
+        recommendations (list) : Titles of movies with the highest positive score.
+        anti_recommendations (list) : Titles of movies with the lowest negative score.
+    """
+    recommendations, anti_recommendations = explain_similar_movies(
+        user_movie_matrix, item_index, user_id, top_n)
+    return list(recommendations), list(anti_recommendations)
+
+
+def explain_similar_movies(user_movie_matrix, item_index, user_id, top_n=5):
+    """
+    Works like `recommend_similar_movies`, but returns dictionaries mapping
+    each recommended (or anti-recommended) title to the rated title that
+    contributed to its score the most.
+    """
+    movie_indices, ratings = user_ratings(user_movie_matrix, user_id)
+    if len(movie_indices) == 0:
+        return {}, {}
+
+    candidates, scores, sources = item_index.scores(movie_indices, ratings)
+    order = np.lexsort((candidates, -scores))
+    best = order[scores[order] > 0][:top_n]
+    worst = order[::-1][scores[order[::-1]] < 0][:top_n]
+    movies = item_index.movies
+    return (
+        {movies[candidates[i]]: movies[sources[i]] for i in best},
+        {movies[candidates[i]]: movies[sources[i]] for i in worst}
+    )
+
+
+if __name__ == "__main__":
+    """
+    Builds item similarity index of the questionnaire offline and stores it in
+    the artifact cache, so the "item" engine only loads it.
+
+    Usage:
+        python item_similarity.py --top-k 20
+    """
+    from recomendation_engine import DATA_PATH, load_item_index
+
+    parser = argparse.ArgumentParser(description="Build item similarity index")
+    parser.add_argument("--data", default=DATA_PATH, help="questionnaire CSV file")
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--sparse", action="store_true", help="use sparse user-movie matrix")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    user_movie_matrix, item_index = load_item_index(args.data, args.top_k, args.sparse)
+    print(f"Index of {len(item_index.movies)} movies with {item_index.neighbours.shape[1]} neighbours "
+          f"ready in {time.perf_counter() - start:.3f} s")
@@ -0,0 +1,94 @@
+import numpy as np
+from scipy import sparse as sp
+from sklearn.cluster import kmeans_plusplus
+from sklearn.metrics import pairwise_distances_argmin_min, pairwise_distances_chunked
+
+
+class KMedoids:
+    """
+    K-medoids clustering with manhattan (L1) distance.
+
+    Users are assigned to the nearest center by manhattan distance and the
+    center of each cluster is its member with the smallest sum of manhattan
+    distances to the other members (medoid). Unlike coordinate-wise median,
+    medoid is a real rating row, so centers don't collapse to zeros when
+    users rate only small part of the movies. Distances to centers are
+    computed in chunks (see `sklearn.metrics.pairwise_distances_argmin_min`)
+    and distances within cluster with `pairwise_distances_chunked`, so
+    memory doesn't grow with square of number of users. To bound time in big
+    clusters, medoid is chosen among the current one and at most
+    `max_candidates` sampled members. Empty clusters are reseeded with the
+    user farthest from its center. Works with dense arrays and
+    `scipy.sparse` matrices.
+
+    Attributes follow `sklearn.cluster.KMeans`: `cluster_centers_`, `labels_`,
+    `inertia_` and `n_iter_`, `medoid_indices_` are rows of the centers.
+
+    Args:
+        n_clusters (int, default=5): The number of clusters to form.
+        max_iter (int, default=100): Maximum number of iterations.
+        max_candidates (int, default=1000): Maximum number of members tried
+        as medoid of a cluster in one iteration.
+        working_memory (int, default=64): Memory in MiB for one chunk of
+        distances within cluster.
+        random_state (int, default=None): Seed of k-means++ initialization
+        and of candidate sampling.
+    """
+
+    def __init__(self, n_clusters=5, max_iter=100, max_candidates=1000, working_memory=64, random_state=None):
+        self.n_clusters = n_clusters
+        self.max_iter = max_iter
+        self.max_candidates = max_candidates
+        self.working_memory = working_memory
+        self.random_state = random_state
+
+    def fit(self, X):
+        if sp.issparse(X):
+            X = sp.csr_matrix(X, dtype=float)
+        else:
+            X = np.asarray(X, dtype=float)
+        generator = np.random.default_rng(self.random_state)
+        _, medoids = kmeans_plusplus(X, self.n_clusters, random_state=self.random_state)
+
+        for self.n_iter_ in range(1, self.max_iter + 1):
+            labels, distances = pairwise_distances_argmin_min(X, X[medoids], metric="manhattan")
+            updated = medoids.copy()
+            for cluster in range(self.n_clusters):
+                members = np.flatnonzero(labels == cluster)
+                if len(members):
+                    updated[cluster] = self._medoid(X, members, medoids[cluster], generator)
+                    continue
+                # empty cluster gets the user farthest from its center
+                for farthest in np.argsort(-distances):
+                    if farthest not in updated:
+                        updated[cluster] = farthest
+                        break
+            if np.array_equal(updated, medoids):
+                break
+            medoids = updated
+
+        self.medoid_indices_ = medoids
+        self.labels_, distances = pairwise_distances_argmin_min(X, X[medoids], metric="manhattan")
+        centers = X[medoids]
+        self.cluster_centers_ = centers.toarray() if sp.issparse(centers) else np.array(centers)
+        self.inertia_ = distances.sum()
+        return self
+
+    def predict(self, X):
+        return pairwise_distances_argmin_min(X, self.cluster_centers_, metric="manhattan")[0]
+
+    def _medoid(self, X, members, current, generator):
+        candidates = members
+        if len(members) > self.max_candidates:
+            candidates = np.sort(generator.choice(members, self.max_candidates, replace=False))
+        if current in members:
+            candidates = np.union1d(candidates, [current])
+        costs = np.concatenate(list(pairwise_distances_chunked(
+            X[candidates], X[members], metric="manhattan", working_memory=self.working_memory,
+            reduce_func=lambda chunk, start: chunk.sum(axis=1)
+        )))
+        best = np.argmin(costs)
+        # keep the current medoid on ties, so iterations stop
+        if current in members and costs[np.searchsorted(candidates, current)] <= costs[best]:
+            return current
+        return candidates[best]
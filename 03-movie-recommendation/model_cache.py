@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import joblib
+
+# Bump when layout of the saved model or the way it is fitted changes, so old artifacts are rebuilt
+ARTIFACT_VERSION = 2
+CACHE_DIR = os.getenv('MODEL_CACHE_DIR', 'cache/models')
+
+
+def file_hash(path):
+    """
+    Computes SHA-256 hash of the file content.
+
+    For directory (e.g. the ratings store) names and sizes of its files are
+    hashed instead - files of append-only directory are never modified, only
+    added or replaced by files with new names.
+
+    Args:
+        path (str): Path to the file or directory.
+
+    Returns:
+        str: Hexadecimal digest of the file content.
+    """
+    digest = hashlib.sha256()
+    if os.path.isdir(path):
+        for name in sorted(name for name in os.listdir(path) if not name.endswith('.tmp')):
+            digest.update(f"{name}:{os.path.getsize(os.path.join(path, name))}\n".encode())
+        return digest.hexdigest()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def artifact_key(data_path, **params):
+    """
+    Builds key of the model artifact from content of the data file, the
+    artifact version and parameters of the model (e.g. metric, n_clusters).
+
+    Args:
+        data_path (str): Path to the file the model is built from.
+        **params: JSON serializable parameters of the model.
+
+    Returns:
+        str: Key identifying the artifact.
+    """
+    description = json.dumps({
+        'version': ARTIFACT_VERSION,
+        'data': file_hash(data_path),
+        'params': params
+    }, sort_keys=True)
+    return hashlib.sha256(description.encode()).hexdigest()[:32]
+
+
+def load_or_build(data_path, build, mmap_mode=None, **params):
+    """
+    Loads model artifact matching the data file and parameters or builds it
+    and saves it for the next calls.
+
+    Artifact is rebuilt only when content of the data file, parameters or
+    `ARTIFACT_VERSION` changes. Unreadable artifacts are rebuilt as well.
+
+    Args:
+        data_path (str): Path to the file the model is built from.
+        build (callable): Function without arguments returning the model.
+        mmap_mode (str, default=None): If set (e.g. "r"), NumPy arrays of the
+        loaded artifact are memory-mapped instead of read into memory.
+        **params: JSON serializable parameters of the model.
+
+    Returns:
+        object: Loaded or freshly built model.
+    """
+    path = os.path.join(CACHE_DIR, f"{artifact_key(data_path, **params)}.joblib")
+    if os.path.exists(path):
+        try:
+            artifact = joblib.load(path, mmap_mode=mmap_mode)
+            if artifact['version'] == ARTIFACT_VERSION:
+                return artifact['model']
+        except Exception as e:
+            print(f"Error loading model artifact {path}: {e}")
+
+    model = build()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    joblib.dump({'version': ARTIFACT_VERSION, 'params': params, 'model': model}, temporary_path)
+    os.replace(temporary_path, path)
+    if mmap_mode is not None:
+        return joblib.load(path, mmap_mode=mmap_mode)['model']
+    return model
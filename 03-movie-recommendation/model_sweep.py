@@ -0,0 +1,224 @@
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from scipy import sparse as sp
+from sklearn.metrics import silhouette_score
+from threadpoolctl import threadpool_limits
+from recomendation_engine import canonical_metric, cluster_users, default_data_path, load_ratings
+
+_shared = {}
+
+
+def split_ratings(data, holdout=0.1, seed=42):
+    """
+    Splits ratings into training and hold-out part. Every user keeps at least
+    one training rating.
+
+    Args:
+        data (pandas.DataFrame): Ratings with "User", "Movie" and "Rating" columns.
+        holdout (float, default=0.1): Fraction of ratings held out.
+        seed (int, default=42): Seed of random generator.
+
+    Returns:
+        tuple: Training CSR matrix with all users and movies and dictionary of
+        held out ratings ("users", "movies" and "ratings" arrays).
+    """
+    user_codes, users = pd.factorize(data["User"], sort=True)
+    movie_codes, movies = pd.factorize(data["Movie"], sort=True)
+    ratings = data["Rating"].to_numpy(dtype=float)
+    held_out = np.random.default_rng(seed).random(len(data)) < holdout
+    train_count = pd.Series(~held_out).groupby(user_codes).transform("sum").to_numpy()
+    held_out &= ~((train_count == 0) & ~pd.Series(user_codes).duplicated().to_numpy())
+
+    train = sp.csr_matrix(
+        (ratings[~held_out], (user_codes[~held_out], movie_codes[~held_out])),
+        shape=(len(users), len(movies))
+    )
+    train.eliminate_zeros()
+    return train, {"users": user_codes[held_out], "movies": movie_codes[held_out], "ratings": ratings[held_out]}
+
+
+def share_arrays(arrays):
+    """
+    Copies arrays to shared memory blocks.
+
+    Returns:
+        tuple: List of `SharedMemory` blocks (the caller closes and unlinks
+        them) and specification of arrays (name of block, shape and dtype)
+        for `attach_arrays`.
+    """
+    blocks, spec = [], {}
+    for name, array in arrays.items():
+        block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+        blocks.append(block)
+        spec[name] = (block.name, array.shape, array.dtype.str)
+    return blocks, spec
+
+
+def attach_arrays(spec, shape):
+    """
+    Pool initializer - attaches shared arrays of the training matrix (dense
+    "matrix" or CSR "data", "indices" and "indptr") and hold-out ratings
+    without copying them. Native thread pools are limited to one thread, so
+    workers don't oversubscribe the cores.
+    """
+    threadpool_limits(1)
+    for name, (block_name, array_shape, dtype) in spec.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _shared[name] = np.ndarray(array_shape, dtype, buffer=block.buf)
+        _shared[f"block_{name}"] = block
+    if "matrix" not in _shared:
+        _shared["matrix"] = sp.csr_matrix((_shared["data"], _shared["indices"], _shared["indptr"]),
+                                          shape=shape, copy=False)
+
+
+def holdout_rmse(matrix, labels, users, movies, ratings):
+    """
+    Predicts held out ratings by mean rating of the movie in the cluster of
+    the user (movie mean of all users when nobody in the cluster rated it).
+
+    Returns:
+        tuple: Root mean squared error and fraction of ratings predicted from
+        the cluster.
+    """
+    n_clusters = labels.max() + 1
+    membership = sp.csr_matrix((np.ones(len(labels)), (labels, np.arange(len(labels)))),
+                               shape=(n_clusters, len(labels)))
+    if sp.issparse(matrix):
+        rated = matrix.copy()
+        rated.data = np.ones_like(rated.data)
+        cluster_sums, cluster_counts = (membership @ matrix).toarray(), (membership @ rated).toarray()
+    else:
+        cluster_sums, cluster_counts = membership @ matrix, membership @ (matrix != 0).astype(float)
+    movie_sums, movie_counts = cluster_sums.sum(axis=0), cluster_counts.sum(axis=0)
+
+    counts = cluster_counts[labels[users], movies]
+    sums = cluster_sums[labels[users], movies]
+    global_mean = movie_sums.sum() / max(movie_counts.sum(), 1)
+    movie_means = np.divide(movie_sums, movie_counts, out=np.full(len(movie_sums), global_mean),
+                            where=movie_counts > 0)
+    predictions = np.where(counts > 0, sums / np.maximum(counts, 1), movie_means[movies])
+    return float(np.sqrt(np.mean((predictions - ratings) ** 2))), float(np.mean(counts > 0))
+
+
+def evaluate(metric, n_clusters, seed, silhouette_sample=2000):
+    """
+    Fits clustering of the shared training matrix and returns its fit time,
+    silhouette score (on sample of users) and hold-out RMSE.
+    """
+    matrix = _shared["matrix"]
+    start = time.perf_counter()
+    model = cluster_users(matrix, n_clusters, metric, random_state=seed)
+    fit_seconds = time.perf_counter() - start
+    labels = np.asarray(model.labels_)
+
+    silhouette = float("nan")
+    if 1 < len(np.unique(labels)) < matrix.shape[0]:
+        silhouette = float(silhouette_score(matrix, labels, metric=canonical_metric(metric),
+                                            sample_size=min(silhouette_sample, matrix.shape[0]),
+                                            random_state=seed))
+    rmse, coverage = holdout_rmse(matrix, labels, _shared["users"], _shared["movies"], _shared["ratings"])
+    return {
+        "metric": metric, "n_clusters": n_clusters, "seed": seed, "fit_seconds": fit_seconds,
+        "silhouette": silhouette, "holdout_rmse": rmse, "cluster_coverage": coverage
+    }
+
+
+def run_sweep(data, metrics, cluster_counts, seeds, holdout=0.1, sparse=False, max_workers=None):
+    """
+    Evaluates every (metric, n_clusters, seed) configuration in parallel.
+
+    Training matrix and hold-out ratings are placed in shared memory once,
+    worker processes attach them on start, so the matrix is not pickled for
+    every task.
+
+    Args:
+        data (pandas.DataFrame): Ratings with "User", "Movie" and "Rating" columns.
+        metrics (list of str): Metrics passed to `cluster_users`.
+        cluster_counts (list of int): Numbers of clusters.
+        seeds (list of int): Seeds of clustering initialization.
+        holdout (float, default=0.1): Fraction of ratings held out.
+        sparse (bool, default=False): Cluster sparse matrix instead of dense one.
+        max_workers (int, default=None): Number of processes, number of CPUs
+        by default.
+
+    Returns:
+        pandas.DataFrame: One row of results per configuration.
+    """
+    train, arrays = split_ratings(data, holdout)
+    if sparse:
+        arrays.update(data=train.data, indices=train.indices, indptr=train.indptr)
+    else:
+        arrays["matrix"] = train.toarray()
+    blocks, spec = share_arrays(arrays)
+    grid = list(itertools.product(metrics, cluster_counts, seeds))
+    try:
+        with ProcessPoolExecutor(max_workers, initializer=attach_arrays, initargs=(spec, train.shape)) as executor:
+            results = list(executor.map(evaluate, *zip(*grid)))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return pd.DataFrame(results)
+
+
+def summarize(results, tolerance=0.05):
+    """
+    Averages results of seeds for every (metric, n_clusters) and marks the
+    cheapest adequate configuration - the fastest one with hold-out RMSE
+    within `tolerance` (relative) of the best one.
+    """
+    summary = results.groupby(["metric", "n_clusters"], as_index=False).agg(
+        fit_seconds=("fit_seconds", "mean"),
+        silhouette=("silhouette", "mean"),
+        holdout_rmse=("holdout_rmse", "mean"),
+        rmse_std=("holdout_rmse", "std"),
+        cluster_coverage=("cluster_coverage", "mean")
+    )
+    adequate = summary[summary["holdout_rmse"] <= summary["holdout_rmse"].min() * (1 + tolerance)]
+    summary["chosen"] = summary.index == adequate["fit_seconds"].idxmin()
+    return summary
+
+
+if __name__ == "__main__":
+    """
+    Model selection sweep over metrics, numbers of clusters and seeds, run in
+    parallel on all cores. Reports fit time, silhouette score and RMSE of
+    held out ratings predicted from cluster means, and chooses the fastest
+    configuration with RMSE within `--tolerance` of the best one.
+
+    Usage:
+        python model_sweep.py --metrics euclidean cosine manhattan --clusters 3 5 8 12 --seeds 1 2 3
+        python model_sweep.py --data resources/synthetic.csv --sparse --workers 4 --output sweep.csv
+    """
+    parser = argparse.ArgumentParser(description="Parallel sweep over clustering configurations")
+    parser.add_argument("--data", default=default_data_path(), help="questionnaire CSV file or ratings store")
+    parser.add_argument("--metrics", nargs="+", default=["euclidean", "cosine", "manhattan"])
+    parser.add_argument("--clusters", type=int, nargs="+", default=[3, 5, 8, 12])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--holdout", type=float, default=0.1, help="fraction of held out ratings")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="allowed RMSE above the best one")
+    parser.add_argument("--sparse", action="store_true", help="cluster sparse user-movie matrix")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", help="CSV file for results of every configuration")
+    args = parser.parse_args()
+
+    data = load_ratings(args.data)
+    start = time.perf_counter()
+    results = run_sweep(data, args.metrics, args.clusters, args.seeds, args.holdout, args.sparse, args.workers)
+    elapsed = time.perf_counter() - start
+    if args.output:
+        results.to_csv(args.output, index=False)
+
+    summary = summarize(results, args.tolerance)
+    print(summary.to_string(index=False, float_format=lambda value: f"{value:.4f}"))
+    chosen = summary[summary["chosen"]].iloc[0]
+    print(f"\n{len(results)} configurations in {elapsed:.2f} s on {args.workers} workers")
+    print(f"Cheapest adequate configuration: metric={chosen['metric']}, n_clusters={chosen['n_clusters']} "
+          f"(python index.py {chosen['metric']} --clusters={chosen['n_clusters']})")
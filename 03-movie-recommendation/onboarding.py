@@ -0,0 +1,225 @@
+import copy
+import numpy as np
+import pandas as pd
+from scipy import sparse as sp
+from sklearn.metrics import pairwise_distances, pairwise_distances_argmin
+from recomendation_engine import (SparseUserMovieMatrix, canonical_metric, cluster_users, recommend_movies,
+                                  user_features)
+
+
+class IncrementalClusters:
+    """
+    Clustering of users that accepts new and updated respondents without
+    refitting k-means on everyone.
+
+    New users are assigned to the nearest existing centroid and, optionally,
+    centroids are moved towards them with running mean (the same update as
+    mini-batch k-means). Cost of onboarding depends on number of clusters and
+    movies, not on number of users. New rows are kept aside and merged into
+    the user-movie matrix only when the matrix is needed.
+
+    For "cosine" metric users are compared by normalised rows and for
+    "manhattan" by manhattan distance to k-medoids centers (running mean
+    moves them away from medoids, drift check bounds the error). For
+    other metrics features are distances to users of the last fit, as in
+    `cluster_users`.
+
+    Full refit is done when number of users added since the last fit reaches
+    `refit_ratio` of users clustered at that fit or when centroids drifted by
+    more than `drift_threshold` (relative distance from centroids of the last
+    fit).
+
+    Args:
+        user_movie_matrix (pandas.DataFrame or SparseUserMovieMatrix): Matrix
+        the `kmeans` model was fitted on.
+        kmeans (sklearn.cluster.KMeans): Fitted clustering model.
+        metric (str, default="euclidean"): Metric used by `cluster_users`.
+        update_centroids (bool, default=True): Move centroids towards onboarded users.
+        refit_ratio (float, default=0.2): Share of new users that triggers full refit.
+        drift_threshold (float, default=0.1): Relative centroid drift that
+        triggers full refit.
+
+    Example:
+        >>> clusters = IncrementalClusters(user_movie_matrix, kmeans)
+        >>> clusters.add_users(pd.DataFrame({"User": ["Jan K."], "Movie": ["Whiplash"], "Rating": [9.0]}))
+        >>> clusters.recommend("Jan K.")
+    """
+
+    def __init__(self, user_movie_matrix, kmeans, metric="euclidean", update_centroids=True,
+                 refit_ratio=0.2, drift_threshold=0.1):
+        self.metric = canonical_metric(metric)
+        self.update_centroids = update_centroids
+        self.refit_ratio = refit_ratio
+        self.drift_threshold = drift_threshold
+        self.refits = 0
+        self._set_model(user_movie_matrix, kmeans)
+
+    def _set_model(self, user_movie_matrix, kmeans):
+        self._matrix = user_movie_matrix
+        self._kmeans = kmeans
+        self._columns = pd.Index(user_movie_matrix.columns)
+        self._positions = {user: position for position, user in enumerate(user_movie_matrix.index)}
+        self._pending = {}
+        self._labels = np.array(kmeans.labels_)
+        self._fitted_users = len(self._labels)
+        self._added_users = 0
+        self.centroids = np.array(kmeans.cluster_centers_, dtype=float)
+        self._fitted_centroids = self.centroids.copy()
+        self._counts = np.bincount(self._labels, minlength=len(self.centroids)).astype(float)
+        if self.metric in ("euclidean", "cosine", "manhattan"):
+            self._reference = None
+        elif isinstance(user_movie_matrix, SparseUserMovieMatrix):
+            self._reference = user_movie_matrix.matrix
+        else:
+            self._reference = user_movie_matrix.to_numpy(dtype=float)
+
+    @property
+    def drift(self):
+        """
+        Relative distance of current centroids from centroids of the last full fit.
+        """
+        norm = np.linalg.norm(self._fitted_centroids)
+        return np.linalg.norm(self.centroids - self._fitted_centroids) / norm if norm else 0.0
+
+    @property
+    def user_movie_matrix(self):
+        """
+        User-movie matrix including onboarded users. Updated users keep their
+        row, new users are appended at the end.
+        """
+        self._merge()
+        return self._matrix
+
+    @property
+    def kmeans(self):
+        """
+        Clustering model with `labels_` of all users, including onboarded ones.
+        Returns a copy, the fitted model given to the constructor (e.g. shared
+        cached artifact) is not modified.
+        """
+        self._merge()
+        kmeans = copy.copy(self._kmeans)
+        kmeans.labels_ = self._labels[:len(self._positions)].copy()
+        return kmeans
+
+    def add_users(self, ratings):
+        """
+        Assigns new or updated users to clusters.
+
+        Ratings of user given here replace all previous ratings of that user
+        (e.g. when the questionnaire was filled once again).
+
+        Args:
+            ratings (pandas.DataFrame): Ratings in long format with "User",
+            "Movie" and "Rating" columns (as returned by `parseData`).
+
+        Returns:
+            pandas.Series: Cluster of each given user.
+        """
+        new_movies = pd.Index(ratings["Movie"].unique()).difference(self._columns)
+        if len(new_movies):
+            self._add_movies(new_movies)
+
+        user_codes, users = pd.factorize(ratings["User"])
+        rows = np.zeros((len(users), len(self._columns)))
+        rows[user_codes, self._columns.get_indexer(ratings["Movie"])] = ratings["Rating"].to_numpy(dtype=float)
+        labels = pairwise_distances_argmin(
+            self._features(rows), self.centroids,
+            metric="manhattan" if self.metric == "manhattan" else "euclidean")
+
+        for user, row, label in zip(users, rows, labels):
+            position = self._positions.get(user)
+            if position is None:
+                position = len(self._positions)
+                self._positions[user] = position
+                if position == len(self._labels):
+                    self._labels = np.pad(self._labels, (0, len(self._labels)))
+                self._added_users += 1
+            elif self.update_centroids:
+                self._move_centroid(self._labels[position], self._row(position), -1)
+            self._pending[position] = row
+            self._labels[position] = label
+            if self.update_centroids:
+                self._move_centroid(label, row, 1)
+
+        if (self._added_users >= self.refit_ratio * self._fitted_users
+                or self.drift > self.drift_threshold):
+            self.refit()
+        return pd.Series(self._labels[[self._positions[user] for user in users]], index=users, name="Cluster")
+
+    def refit(self):
+        """
+        Refits k-means on all users and resets onboarding counters.
+        """
+        self._merge()
+        kmeans = cluster_users(self._matrix, len(self.centroids), self.metric)
+        self.refits += 1
+        self._set_model(self._matrix, kmeans)
+
+    def recommend(self, user, top_n=5):
+        """
+        Returns recommendations and anti-recommendations (see `recommend_movies`)
+        for user identifier.
+        """
+        return recommend_movies(self.user_movie_matrix, self.kmeans, self._positions[user], top_n)
+
+    def _features(self, rows):
+        if self._reference is None:
+            return user_features(rows, self.metric)
+        return pairwise_distances(rows, self._reference, metric=self.metric)
+
+    def _move_centroid(self, label, row, sign):
+        count = self._counts[label] + sign
+        if count <= 0:
+            return
+        features = self._features(row[None, :])[0]
+        self.centroids[label] += sign * (features - self.centroids[label]) / count
+        self._counts[label] = count
+
+    def _row(self, position):
+        if position in self._pending:
+            return self._pending[position]
+        row = self._matrix.matrix[position].toarray()[0] \
+            if isinstance(self._matrix, SparseUserMovieMatrix) \
+            else self._matrix.iloc[position].to_numpy(dtype=float)
+        return np.pad(row, (0, len(self._columns) - len(row)))
+
+    def _add_movies(self, movies):
+        self._columns = self._columns.append(movies)
+        self._pending = {position: np.pad(row, (0, len(movies))) for position, row in self._pending.items()}
+        if self._reference is None:
+            self.centroids = np.pad(self.centroids, ((0, 0), (0, len(movies))))
+            self._fitted_centroids = np.pad(self._fitted_centroids, ((0, 0), (0, len(movies))))
+        elif sp.issparse(self._reference):
+            self._reference = sp.csr_matrix(
+                (self._reference.data, self._reference.indices, self._reference.indptr),
+                shape=(self._reference.shape[0], len(self._columns)))
+        else:
+            self._reference = np.pad(self._reference, ((0, 0), (0, len(movies))))
+
+    def _merge(self):
+        if not self._pending and len(self._columns) == self._matrix.shape[1]:
+            return
+        users = pd.Index(sorted(self._positions, key=self._positions.get), name=self._matrix.index.name)
+        positions = np.fromiter(self._pending.keys(), dtype=np.int64, count=len(self._pending))
+        rows = np.array(list(self._pending.values())).reshape(len(positions), len(self._columns))
+
+        if isinstance(self._matrix, SparseUserMovieMatrix):
+            base = self._matrix.matrix
+            indptr = np.pad(base.indptr, (0, len(users) - base.shape[0]), mode="edge")
+            base = sp.csr_matrix((base.data, base.indices, indptr), shape=(len(users), len(self._columns)))
+            keep = np.ones(len(users))
+            keep[positions] = 0
+            nonzero_rows, nonzero_columns = np.nonzero(rows)
+            pending = sp.csr_matrix(
+                (rows[nonzero_rows, nonzero_columns], (positions[nonzero_rows], nonzero_columns)),
+                shape=(len(users), len(self._columns)))
+            matrix = (sp.diags(keep) @ base + pending).tocsr()
+            matrix.eliminate_zeros()
+            self._matrix = SparseUserMovieMatrix(matrix, users, pd.Index(self._columns, name="Movie"))
+        else:
+            matrix = np.zeros((len(users), len(self._columns)))
+            matrix[:self._matrix.shape[0], :self._matrix.shape[1]] = self._matrix.to_numpy(dtype=float)
+            matrix[positions] = rows
+            self._matrix = pd.DataFrame(matrix, index=users, columns=pd.Index(self._columns, name="Movie"))
+        self._pending = {}
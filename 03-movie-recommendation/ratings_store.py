@@ -0,0 +1,141 @@
+import argparse
+import os
+import time
+import pandas as pd
+import pyarrow as pa
+from pyarrow import ipc
+
+STORE_PATH = os.getenv('RATINGS_STORE_PATH', 'resources/ratings')
+SCHEMA = pa.schema([
+    ('User', pa.dictionary(pa.int32(), pa.string())),
+    ('Movie', pa.dictionary(pa.int32(), pa.string())),
+    ('Rating', pa.float32())
+])
+
+
+def read_segment(path):
+    """
+    Returns table of the segment file. The file is memory-mapped, columns
+    are read from disk only when they are used.
+    """
+    return ipc.open_file(pa.memory_map(path)).read_all()
+
+
+class RatingsStore:
+    """
+    Append-only columnar store of ratings in long (user, movie, rating) form.
+
+    Ratings are kept in directory of Arrow IPC segment files. User names and
+    titles are dictionary-encoded, so each distinct string is stored once per
+    segment and rows hold only int32 codes. Segments are never modified -
+    `append` writes a new one and `compact` replaces all of them with a
+    single segment. Segments are read memory-mapped and only the requested
+    columns are touched.
+
+    Args:
+        path (str, default=STORE_PATH): Directory of the store.
+    """
+
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+
+    def segments(self):
+        """
+        Returns paths of segment files in the order they were written.
+        """
+        if not os.path.isdir(self.path):
+            return []
+        names = sorted(name for name in os.listdir(self.path) if name.endswith('.arrow'))
+        return [os.path.join(self.path, name) for name in names]
+
+    def append(self, ratings):
+        """
+        Appends ratings as a new segment.
+
+        Args:
+            ratings (pandas.DataFrame): Ratings with "User", "Movie" and
+            "Rating" columns.
+
+        Returns:
+            int: Number of appended ratings.
+        """
+        missing = {'User', 'Movie', 'Rating'} - set(ratings.columns)
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(sorted(missing))}")
+        table = pa.Table.from_pandas(ratings[['User', 'Movie', 'Rating']].astype({'User': str, 'Movie': str}),
+                                     schema=SCHEMA, preserve_index=False)
+        self._write(table, f"{time.time_ns():020d}-{os.getpid()}.arrow")
+        return table.num_rows
+
+    def read(self, columns=None):
+        """
+        Reads ratings of all segments.
+
+        Args:
+            columns (list of str, default=None): Columns to read, all by default.
+
+        Returns:
+            pandas.DataFrame: Ratings, "User" and "Movie" as categorical columns.
+        """
+        columns = columns or SCHEMA.names
+        tables = [read_segment(segment).select(columns) for segment in self.segments()]
+        if not tables:
+            return pa.schema([SCHEMA.field(name) for name in columns]).empty_table().to_pandas()
+        return pa.concat_tables(tables).to_pandas()
+
+    def compact(self):
+        """
+        Replaces all segments with single one, with common dictionaries of
+        users and titles.
+
+        Returns:
+            int: Number of ratings in the store.
+        """
+        segments = self.segments()
+        if len(segments) <= 1:
+            return sum(read_segment(segment).num_rows for segment in segments)
+        table = pa.concat_tables(read_segment(segment) for segment in segments)
+        table = table.unify_dictionaries().combine_chunks()
+        self._write(table, f"{time.time_ns():020d}-{os.getpid()}.arrow")
+        for segment in segments:
+            os.remove(segment)
+        return table.num_rows
+
+    def _write(self, table, name):
+        os.makedirs(self.path, exist_ok=True)
+        temporary_path = os.path.join(self.path, f"{name}.tmp")
+        with pa.OSFile(temporary_path, 'wb') as sink, ipc.new_file(sink, SCHEMA) as writer:
+            writer.write_table(table)
+        os.replace(temporary_path, os.path.join(self.path, name))
+
+
+if __name__ == "__main__":
+    """
+    Manages the ratings store.
+
+    Usage:
+        python ratings_store.py import --data resources/questionary_list.csv
+        python ratings_store.py compact
+        python ratings_store.py stats
+    """
+    from recomendation_engine import DATA_PATH, parseData
+
+    parser = argparse.ArgumentParser(description="Columnar ratings store")
+    parser.add_argument("command", choices=["import", "compact", "stats"])
+    parser.add_argument("--data", default=DATA_PATH, help="legacy questionnaire CSV file to import")
+    parser.add_argument("--store", default=STORE_PATH, help="directory of the store")
+    args = parser.parse_args()
+
+    store = RatingsStore(args.store)
+    if args.command == "import":
+        if store.segments():
+            parser.error(f"store {args.store} is not empty, remove it to import again")
+        count = store.append(parseData(pd.read_csv(args.data, header=None)))
+        print(f"Imported {count} ratings from {args.data} to {args.store}")
+    elif args.command == "compact":
+        print(f"Store compacted to one segment of {store.compact()} ratings")
+    else:
+        data = store.read()
+        size = sum(os.path.getsize(segment) for segment in store.segments())
+        print(f"{len(store.segments())} segments, {len(data)} ratings, {data['User'].nunique()} users, "
+              f"{data['Movie'].nunique()} movies, {size / 2**10:.1f} kB")
@@ -2,9 +2,53 @@ import pandas as pd
 import numpy as np
 from sklearn.cluster import KMeans
 from sklearn.metrics import pairwise_distances
+from sklearn.preprocessing import normalize
+from scipy import sparse as sp
+from kmedoids import KMedoids
+from item_similarity import build_item_index, recommend_similar_movies
+from factorization import fit_factorization, recommend_factorized_movies
+from model_cache import load_or_build
+from ratings_store import STORE_PATH, RatingsStore
+import os
 import sys
 
-def preprocess_data(data):
+DATA_PATH = "resources/questionary_list.csv"
+METRIC_ALIASES = {"l2": "euclidean", "l1": "manhattan", "cityblock": "manhattan"}
+
+class SparseUserMovieMatrix:
+    """
+    User-movie matrix stored as `scipy.sparse` CSR matrix.
+
+    Each respondent rates only a small part of all movies, so keeping only
+    the ratings makes memory usage proportional to number of ratings instead
+    of users x movies. Attributes follow the dense `pandas.DataFrame`, so
+    both representations can be passed to the engine functions.
+
+    Attributes:
+        matrix (scipy.sparse.csr_matrix): Ratings, rows are users and columns
+        are movies. Not stored values mean that user has not rated the movie.
+        index (pandas.Index): User identifiers of rows.
+        columns (pandas.Index): Movie titles of columns.
+    """
+
+    def __init__(self, matrix, index, columns):
+        self.matrix = matrix
+        self.index = index
+        self.columns = columns
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    def to_dense(self):
+        """
+        Returns the matrix as dense `pandas.DataFrame` (same as `preprocess_data`
+        with `sparse=False`).
+        """
+        return pd.DataFrame(self.matrix.toarray(), index=self.index, columns=self.columns)
+
+def preprocess_data(data, sparse=False):
+
     """
     Preprocess raw user-movie rating data into a matrix suitable for clustering.
 
@@ -24,24 +68,71 @@ def preprocess_data(data):
         - "Movie": Identifier for each movie (e.g., movie titles or IDs).
         - "Rating": The rating a user has given to a movie.
 
+        sparse (bool, default=False)
+        If True, the matrix is built as `SparseUserMovieMatrix`, which stores
+        only given ratings (missing ratings are implicit zeros).
+
     Returns:
-        user_movie_matrix (pandas.DataFrame)
+        user_movie_matrix (pandas.DataFrame or SparseUserMovieMatrix)
         A pivot table where rows correspond to users, columns correspond to 
         movies, and the values are the ratings. Missing ratings are replaced 
         with 0.
     """
+    if sparse:
+        if data.duplicated(["User", "Movie"]).any():
+            raise ValueError("Index contains duplicate entries, cannot reshape")
+        user_codes, users = pd.factorize(data["User"], sort=True)
+        movie_codes, movies = pd.factorize(data["Movie"], sort=True)
+        matrix = sp.csr_matrix(
+            (data["Rating"].to_numpy(dtype=float), (user_codes, movie_codes)),
+            shape=(len(users), len(movies))
+        )
+        matrix.eliminate_zeros()
+        return SparseUserMovieMatrix(matrix, pd.Index(users, name="User"), pd.Index(movies, name="Movie"))
+
     user_movie_matrix = data.pivot(index="User", columns="Movie", values="Rating")
     user_movie_matrix = user_movie_matrix.fillna(0)
     return user_movie_matrix
 
 
+def canonical_metric(metric):
+    """
+    Returns common name of the metric, e.g. "manhattan" for "l1" and "cityblock".
+    """
+    return METRIC_ALIASES.get(metric, metric)
+
+def user_features(user_movie_matrix, metric="euclidean"):
+    """
+    Returns representation of users that clustering with given metric works on.
+
+    For "cosine" metric rows are normalised to unit length - squared euclidean
+    distance between normalised rows equals 2 * cosine distance, so k-means on
+    them groups users by cosine similarity. For other metrics rows are returned
+    unchanged.
+
+    Args:
+        user_movie_matrix (array-like, sparse matrix or SparseUserMovieMatrix):
+        Ratings of users.
+        metric (str, default="euclidean"): The distance metric.
+
+    Returns:
+        numpy.ndarray or scipy.sparse.csr_matrix: Features of users.
+    """
+    if isinstance(user_movie_matrix, SparseUserMovieMatrix):
+        user_movie_matrix = user_movie_matrix.matrix
+    elif isinstance(user_movie_matrix, pd.DataFrame):
+        user_movie_matrix = user_movie_matrix.to_numpy(dtype=float)
+    if canonical_metric(metric) == "cosine":
+        return normalize(user_movie_matrix)
+    return user_movie_matrix
+
 # Clustering with KMeans
-def cluster_users(user_movie_matrix, n_clusters=5, metric="euclidean"):
+def cluster_users(user_movie_matrix, n_clusters=5, metric="euclidean", random_state=42):
     """
     Cluster users based on their movie preferences using the k-means algorithm.
 
     Args:
-    user_movie_matrix : array-like or sparse matrix, shape (n_users, n_movies)
+    user_movie_matrix : array-like, sparse matrix or SparseUserMovieMatrix, shape (n_users, n_movies)
         A matrix where each row represents a user, and each column represents 
         a movie. The values indicate user preferences or interactions with 
         the corresponding movies (e.g., ratings or binary indicators).
@@ -50,22 +141,38 @@ def cluster_users(user_movie_matrix, n_clusters=5, metric="euclidean"):
         The number of clusters to form.
 
     metric : str, default="euclidean"
-        The distance metric to use for clustering. If "euclidean", the k-means 
-        algorithm operates directly on the `user_movie_matrix`. For other metrics, 
-        a pairwise distance matrix is computed, and clustering is performed on 
-        this matrix. Supported metrics include "manhattan", "cosine", etc.
+        The distance metric to use for clustering. If "euclidean" (or "l2"),
+        the k-means algorithm operates directly on the `user_movie_matrix`.
+        For "cosine", k-means operates on rows normalised to unit length (see
+        `user_features`). For "manhattan" (or "l1", "cityblock"), users are
+        clustered with k-medoids (see `KMedoids`). None of them builds
+        users x users distance matrix, so memory grows linearly with number of
+        users. For other metrics, a pairwise distance matrix is computed, and
+        clustering is performed on this matrix (sparse ratings are converted
+        to dense array first).
+
+    random_state : int, default=42
+        Seed of centroid initialization.
 
     Returns:
-        sklearn.cluster.KMeans : A fitted k-means clustering model. The `labels_`
+        sklearn.cluster.KMeans or KMedoids : A fitted clustering model. The `labels_`
         attribute of the model contains the cluster assignments for each user.
     """
-    if metric != "euclidean":
-        dist_matrix = pairwise_distances(user_movie_matrix, metric=metric)
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42)
+    metric = canonical_metric(metric)
+    features = user_features(user_movie_matrix, metric)
+    if metric == "manhattan":
+        kmeans = KMedoids(n_clusters=n_clusters, random_state=random_state)
+        kmeans.fit(features)
+    elif metric not in ("euclidean", "cosine"):
+        # scipy metrics don't support sparse input, the distance matrix is dense users x users anyway
+        if sp.issparse(features):
+            features = features.toarray()
+        dist_matrix = pairwise_distances(features, metric=metric)
+        kmeans = KMeans(n_clusters=n_clusters, random_state=random_state)
         kmeans.fit(dist_matrix)
     else:
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-        kmeans.fit(user_movie_matrix)
+        kmeans = KMeans(n_clusters=n_clusters, random_state=random_state)
+        kmeans.fit(features)
     return kmeans
 
 def recommend_movies(user_movie_matrix, kmeans, user_id, top_n=5):
@@ -77,10 +184,10 @@ def recommend_movies(user_movie_matrix, kmeans, user_id, top_n=5):
     movies as anti-recommendations.
 
     Args:
-    user_movie_matrix (pandas.DataFrame) : A user-movie matrix where rows
-        represent users, columns represent movies, and values represent the
-        ratings given by users to movies. A value of 0 indicates the user has
-        not rated (or seen) the movie.
+    user_movie_matrix (pandas.DataFrame or SparseUserMovieMatrix) : A user-movie
+        matrix where rows represent users, columns represent movies, and values
+        represent the ratings given by users to movies. A value of 0 indicates
+        the user has not rated (or seen) the movie.
 
     kmeans (sklearn.cluster.KMeans) : A fitted k-means clustering model where
         each user is assigned to a cluster 
@@ -101,24 +208,155 @@ def recommend_movies(user_movie_matrix, kmeans, user_id, top_n=5):
 
     """
     cluster = kmeans.labels_[user_id]
-    cluster_users = user_movie_matrix[kmeans.labels_ == cluster]
+    if isinstance(user_movie_matrix, SparseUserMovieMatrix):
+        matrix = user_movie_matrix.matrix
+        members = kmeans.labels_ == cluster
+        avg_ratings = np.asarray(matrix[members].sum(axis=0)).ravel() / members.sum()
+        unseen = np.ones(matrix.shape[1], dtype=bool)
+        unseen[matrix[user_id].indices] = False
+        unseen_movies = pd.Series(avg_ratings[unseen], index=user_movie_matrix.columns[unseen])
+    else:
+        cluster_users = user_movie_matrix[kmeans.labels_ == cluster]
 
-    avg_ratings = cluster_users.mean(axis=0)
-    user_ratings = user_movie_matrix.iloc[user_id]
-    unseen_movies = avg_ratings[user_ratings == 0]
+        avg_ratings = cluster_users.mean(axis=0)
+        user_ratings = user_movie_matrix.iloc[user_id]
+        unseen_movies = avg_ratings[user_ratings == 0]
 
     recommendations = unseen_movies.sort_values(ascending=False).head(top_n).index.tolist()
     anti_recommendations = unseen_movies.sort_values(ascending=True).head(top_n).index.tolist()
     return recommendations, anti_recommendations
 
+def top_n_indices(scores, top_n):
+    """
+    Selects indices of `top_n` highest scores in each row, ordered from the
+    highest. Uses `numpy.argpartition`, so only the selected part is sorted.
+    Ties are ordered by column index.
+    """
+    top_n = min(top_n, scores.shape[1])
+    if top_n == 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    candidates = np.argpartition(-scores, top_n - 1, axis=1)[:, :top_n]
+    candidates.sort(axis=1)
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1)
+
+def recommend_movies_for_all_users(user_movie_matrix, kmeans, top_n=5, chunk_size=None):
+    """
+    Generate movie recommendations and anti-recommendations for every user at once.
+
+    Works like `recommend_movies` called for each user, but mean ratings of
+    every cluster are computed only once (as one sparse membership matrix
+    product), seen movies are masked with matrix operations and top and
+    bottom movies are selected with `numpy.argpartition`. Users are processed
+    in chunks, so memory doesn't grow with users x movies.
+
+    Movies with equal average rating may be ordered differently than in
+    `recommend_movies`, which doesn't define order of ties.
+
+    Args:
+    user_movie_matrix (pandas.DataFrame or SparseUserMovieMatrix) : A user-movie
+        matrix, a value of 0 indicates the user has not rated the movie.
+
+    kmeans (sklearn.cluster.KMeans) : A fitted k-means clustering model.
+
+    top_n (int, default=5): The number of top recommendations and
+        anti-recommendations for each user.
+
+    chunk_size (int, default=None): Number of users scored together. By
+        default it is chosen so that scores of a chunk have ~4M elements.
+
+    Returns:
+        recommendations (numpy.ndarray) : Array of shape (n_users, top_n) with
+        column indices of recommended movies. Positions are filled with -1
+        when user has less than `top_n` unseen movies.
+
+        anti_recommendations (numpy.ndarray) : Array of shape (n_users, top_n)
+        with column indices of the least recommended movies.
+    """
+    if isinstance(user_movie_matrix, SparseUserMovieMatrix):
+        matrix = user_movie_matrix.matrix
+    else:
+        matrix = user_movie_matrix.to_numpy(dtype=float)
+    n_users, n_movies = matrix.shape
+    labels = kmeans.labels_
+    n_clusters = labels.max() + 1
+
+    membership = sp.csr_matrix(
+        (np.ones(n_users), (labels, np.arange(n_users))), shape=(n_clusters, n_users)
+    )
+    cluster_sums = membership @ matrix
+    if sp.issparse(cluster_sums):
+        cluster_sums = cluster_sums.toarray()
+    cluster_means = cluster_sums / np.bincount(labels, minlength=n_clusters)[:, None]
+
+    top_n = min(top_n, n_movies)
+    recommendations = np.full((n_users, top_n), -1, dtype=np.int64)
+    anti_recommendations = np.full((n_users, top_n), -1, dtype=np.int64)
+    if chunk_size is None:
+        chunk_size = max(1, (1 << 22) // max(n_movies, 1))
+
+    for start in range(0, n_users, chunk_size):
+        rows = slice(start, start + chunk_size)
+        seen = matrix[rows] != 0
+        if sp.issparse(seen):
+            seen = seen.toarray()
+        scores = cluster_means[labels[rows]]
+        best = top_n_indices(np.where(seen, -np.inf, scores), top_n)
+        worst = top_n_indices(np.where(seen, -np.inf, -scores), top_n)
+
+        missing = np.arange(top_n) >= (n_movies - seen.sum(axis=1))[:, None]
+        best[missing] = -1
+        worst[missing] = -1
+        recommendations[rows] = best
+        anti_recommendations[rows] = worst
+    return recommendations, anti_recommendations
+
+def save_recommendations(path, user_movie_matrix, recommendations, anti_recommendations):
+    """
+    Saves result of `recommend_movies_for_all_users` to columnar file.
+
+    For ".parquet" files recommendations are written in long format with
+    columns "User", "Kind" ("recommendation" or "anti-recommendation"),
+    "Rank" and "Movie". Other paths are written as NumPy ".npz" archive with
+    "users", "movies", "recommendations" and "anti_recommendations" arrays,
+    where recommendations are column indices into "movies".
+
+    Args:
+        path (str): Destination file.
+        user_movie_matrix (pandas.DataFrame or SparseUserMovieMatrix): Matrix
+        used to make recommendations, provides user and movie index.
+        recommendations (numpy.ndarray): Recommended movie indices.
+        anti_recommendations (numpy.ndarray): Anti-recommended movie indices.
+    """
+    users = np.asarray(user_movie_matrix.index)
+    movies = np.asarray(user_movie_matrix.columns)
+    if not path.endswith(".parquet"):
+        np.savez_compressed(
+            path, users=users.astype(str), movies=movies.astype(str),
+            recommendations=recommendations, anti_recommendations=anti_recommendations
+        )
+        return
+
+    frames = []
+    for kind, indices in (("recommendation", recommendations), ("anti-recommendation", anti_recommendations)):
+        user_positions, ranks = np.nonzero(indices >= 0)
+        frames.append(pd.DataFrame({
+            "User": pd.Categorical.from_codes(user_positions, pd.Index(users)),
+            "Kind": kind,
+            "Rank": (ranks + 1).astype(np.min_scalar_type(indices.shape[1])),
+            "Movie": pd.Categorical.from_codes(indices[user_positions, ranks], pd.Index(movies))
+        }))
+    pd.concat(frames, ignore_index=True).to_parquet(path, index=False)
+
 def parseData(data):
     """
-    Parse a DataFrame containing user and movie-rating pairs into a structured list.
+    Parse a DataFrame containing user and movie-rating pairs into a long format.
 
     This function processes a DataFrame where each row represents a user, followed by 
-    alternating movie titles and their corresponding ratings. It extracts this information 
-    and returns it as a list of dictionaries, where each dictionary contains a user, 
-    a movie, and the associated rating.
+    alternating movie titles and their corresponding ratings. Instead of walking
+    the rows one by one, the wide "title, rating, title, rating..." layout is
+    reshaped at once: title and rating columns are stacked into flat arrays,
+    users are repeated for each pair and incomplete pairs are masked out.
 
     Args:
         data (pandas.DataFrame): A DataFrame where:
@@ -128,57 +366,211 @@ def parseData(data):
         Missing values (NaN) in either movie or rating columns are ignored.
 
     Returns:
-        list of dict: A list of dictionaries where each dictionary has the following keys:
+        pandas.DataFrame: A DataFrame with one row per rating, ordered by user
+        and then by position of the pair in the row, with following columns:
         - "User": The user identifier.
         - "Movie": The movie name.
         - "Rating": The movie rating (as a float).
     """
-    count = data.shape[0]
-    parsedData = []
+    pairs_count = (data.shape[1] - 1) // 2
+    users = data.iloc[:, 0].to_numpy(dtype=object)
+    movies = data.iloc[:, 1:2 * pairs_count + 1:2].to_numpy(dtype=object).ravel()
+    ratings = data.iloc[:, 2:2 * pairs_count + 2:2].to_numpy(dtype=object).ravel()
+
+    mask = pd.notna(movies) & pd.notna(ratings)
+    return pd.DataFrame({
+        "User": np.repeat(users, pairs_count)[mask],
+        "Movie": movies[mask],
+        "Rating": ratings[mask].astype(float)
+    })
+    
+
+def default_data_path():
+    """
+    Returns path of the ratings store (see `ratings_store.py`) if it was
+    created, otherwise path of the legacy questionnaire CSV file.
+    """
+    return STORE_PATH if RatingsStore(STORE_PATH).segments() else DATA_PATH
 
-    for _, row in data.iterrows():
-        user_name = row.iloc[0]
-        movie_rating_pairs = row.iloc[1:]  # Skip the first two columns - username/NaN pair
+def load_ratings(data_path=DATA_PATH, columns=None):
+    """
+    Loads ratings in long form from the ratings store directory or from the
+    legacy questionnaire CSV file.
 
-        for i in range(count - 1, len(movie_rating_pairs), 2):
-            movie = movie_rating_pairs[i]
-            rating = movie_rating_pairs[i + 1]
+    The store is read memory-mapped and only `columns` are loaded. When user
+    rated the same movie in more than one appended batch, the latest rating
+    is kept.
 
-            if pd.notna(movie) and pd.notna(rating):
-                parsedData.append({"User": user_name, "Movie": movie, "Rating": float(rating)})
-    return parsedData
-    
+    Args:
+        data_path (str): Directory of the ratings store or questionnaire CSV file.
+        columns (list of str, default=None): Columns to load ("User", "Movie",
+        "Rating"), all by default.
+
+    Returns:
+        pandas.DataFrame: Ratings with "User" and "Movie" as strings.
+    """
+    if not os.path.isdir(data_path):
+        data = parseData(pd.read_csv(data_path, header=None))
+        return data[columns] if columns else data
+
+    data = RatingsStore(data_path).read(columns)
+    if {"User", "Movie"} <= set(data.columns):
+        data = data.drop_duplicates(["User", "Movie"], keep="last", ignore_index=True)
+    types = {"User": object, "Movie": object, "Rating": float}
+    return data.astype({column: types[column] for column in data.columns})
+
+def build_model(data_path=DATA_PATH, n_clusters=5, metric="euclidean", sparse=False):
+    """
+    Reads the questionnaire and fits the clustering model from scratch.
+
+    Args:
+        data_path (str): Path to the questionnaire CSV file or ratings store.
+        n_clusters (int, default=5): The number of clusters to form.
+        metric (str, default="euclidean"): The distance metric used for clustering.
+        sparse (bool, default=False): Use sparse user-movie matrix.
+
+    Returns:
+        tuple: The user-movie matrix (with user and movie index) and fitted
+        `sklearn.cluster.KMeans` model.
+    """
+    user_movie_matrix = preprocess_data(load_ratings(data_path), sparse)
+    return user_movie_matrix, cluster_users(user_movie_matrix, n_clusters, metric)
 
-def getRecomendations(user_id = 0):
+def load_model(data_path=DATA_PATH, n_clusters=5, metric="euclidean", sparse=False, use_cache=True):
+    """
+    Returns the user-movie matrix and fitted clustering model, loading them
+    from the artifact cache (see `model_cache.py`) when possible.
+
+    Artifact is keyed by content hash of the questionnaire together with the
+    metric, `n_clusters` and matrix type, so the model is refitted only when
+    any of them changes.
+
+    Args:
+        data_path (str): Path to the questionnaire CSV file or ratings store.
+        n_clusters (int, default=5): The number of clusters to form.
+        metric (str, default="euclidean"): The distance metric used for clustering.
+        sparse (bool, default=False): Use sparse user-movie matrix.
+        use_cache (bool, default=True): If False, model is always refitted.
+
+    Returns:
+        tuple: The user-movie matrix and fitted `sklearn.cluster.KMeans` model.
+    """
+    def build():
+        return build_model(data_path, n_clusters, metric, sparse)
+
+    if not use_cache:
+        return build()
+    return load_or_build(data_path, build, n_clusters=n_clusters, metric=metric, sparse=sparse)
+
+def load_item_index(data_path=DATA_PATH, top_k=20, sparse=False, use_cache=True):
+    """
+    Returns the user-movie matrix and item similarity index (see
+    `item_similarity.py`), loading them from the artifact cache when possible.
+    Arrays of the cached index are memory-mapped.
+
+    Args:
+        data_path (str): Path to the questionnaire CSV file or ratings store.
+        top_k (int, default=20): Number of neighbours kept for each movie.
+        sparse (bool, default=False): Use sparse user-movie matrix.
+        use_cache (bool, default=True): If False, index is always rebuilt.
+
+    Returns:
+        tuple: The user-movie matrix and `ItemSimilarityIndex`.
+    """
+    def build():
+        user_movie_matrix = preprocess_data(load_ratings(data_path), sparse)
+        return user_movie_matrix, build_item_index(user_movie_matrix, top_k)
+
+    if not use_cache:
+        return build()
+    return load_or_build(data_path, build, mmap_mode="r", engine="item", top_k=top_k, sparse=sparse)
+
+def load_factorization(data_path=DATA_PATH, rank=20, sparse=False, use_cache=True):
+    """
+    Returns the user-movie matrix and low-rank factorization of it (see
+    `factorization.py`), loading them from the artifact cache when possible.
+
+    Args:
+        data_path (str): Path to the questionnaire CSV file or ratings store.
+        rank (int, default=20): Number of dimensions of the embeddings.
+        sparse (bool, default=False): Use sparse user-movie matrix.
+        use_cache (bool, default=True): If False, model is always refitted.
+
+    Returns:
+        tuple: The user-movie matrix and `MatrixFactorization`.
+    """
+    def build():
+        user_movie_matrix = preprocess_data(load_ratings(data_path), sparse)
+        return user_movie_matrix, fit_factorization(user_movie_matrix, rank)
+
+    if not use_cache:
+        return build()
+    return load_or_build(data_path, build, mmap_mode="r", engine="svd", rank=rank, sparse=sparse)
+
+def getRecomendations(user_id = 0, sparse=False, use_cache=True, engine="kmeans", n_clusters=5):
     """
     Generate movie recommendations and anti-recommendations for a given user.
 
     This function processes a dataset containing user-movie-rating data, clusters 
     users into groups based on their preferences, and provides personalized 
-    recommendations and anti-recommendations for a specified user.
+    recommendations and anti-recommendations for a specified user. Ratings
+    are read from the ratings store (see `ratings_store.py`) when it was
+    created, otherwise from the questionnaire CSV file.
 
     Args:
         user_id (int, default=0): The identifier of the user for whom
         recommendations and anti-recommendations are generated. The `user_id`
         should correspond to a row index in the user-movie matrix.
 
+        sparse (bool, default=False): Use sparse user-movie matrix (see
+        `SparseUserMovieMatrix`) instead of dense one.
+
+        use_cache (bool, default=True): Load fitted model from the artifact
+        cache instead of refitting it on every call.
+
+        engine (str, default="kmeans"): "kmeans" recommends movies liked in
+        the cluster of the user, "item" recommends movies similar to the ones
+        the user rated (see `item_similarity.py`), "svd" recommends movies
+        with the highest ratings predicted by low-rank factorization (see
+        `factorization.py`).
+
+        n_clusters (int, default=5): Number of clusters of the "kmeans"
+        engine, `model_sweep.py` helps to choose it.
+
     Returns:
         dict: A dictionary containing:
         - "recommendations": A list of recommended movies for the user.
         - "anti-recommendations": A list of movies not recommended for the user.
 
     """
-    data = pd.read_csv("resources/questionary_list.csv", header=None)
-    parsed_data = parseData(data)
-    user_movie_matrix = preprocess_data(pd.DataFrame(parsed_data))
+    if engine not in ("kmeans", "item", "svd"):
+        raise ValueError(f"Unknown engine: {engine}")
+    data_path = default_data_path()
+    if engine == "item":
+        user_movie_matrix, item_index = load_item_index(data_path, sparse=sparse, use_cache=use_cache)
+        recommendations, anti_recommendations = recommend_similar_movies(user_movie_matrix, item_index, user_id)
+        return {
+            "recomendations": recommendations,
+            "anti-recommendations": anti_recommendations
+        }
+
+    if engine == "svd":
+        user_movie_matrix, model = load_factorization(data_path, sparse=sparse, use_cache=use_cache)
+        recommendations, anti_recommendations = recommend_factorized_movies(user_movie_matrix, model, user_id)
+        return {
+            "recomendations": recommendations,
+            "anti-recommendations": anti_recommendations
+        }
+
+    arguments = [argument for argument in sys.argv[1:] if not argument.startswith("--")]
     metric = "euclidean"
-    if len(sys.argv) > 1:
-        metric = sys.argv[1]
+    if arguments:
+        metric = arguments[0]
         print(f"Using: {metric} metric")
     else:
         print("No metric provided, using euclidean")
 
-    kmeans = cluster_users(user_movie_matrix, 5, metric)
+    user_movie_matrix, kmeans = load_model(data_path, n_clusters, metric, sparse, use_cache)
 
     recommendations, anti_recommendations = recommend_movies(user_movie_matrix, kmeans, user_id)
 
@@ -0,0 +1,259 @@
+import argparse
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+import pandas as pd
+from factorization import recommend_factorized_movies
+from item_similarity import recommend_similar_movies
+from onboarding import IncrementalClusters
+from recomendation_engine import (DATA_PATH, default_data_path, load_model, load_item_index,
+                                  load_factorization, load_ratings, recommend_movies)
+from title_index import lookup_titles
+
+
+def load_engine(data_path, engine, metric="euclidean", sparse=False):
+    """
+    Returns the user-movie matrix and model of the recommendation engine
+    ("kmeans", "item" or "svd").
+    """
+    if engine == "item":
+        return load_item_index(data_path, sparse=sparse)
+    if engine == "svd":
+        return load_factorization(data_path, sparse=sparse)
+    if engine == "kmeans":
+        return load_model(data_path, 5, metric, sparse)
+    raise ValueError(f"Unknown engine: {engine}")
+
+
+def user_digests(ratings):
+    """
+    Returns hash of ratings of every user (in long format, see `load_ratings`),
+    which changes when any rating of the user is added, changed or removed.
+    """
+    hashes = pd.util.hash_pandas_object(ratings[["Movie", "Rating"]], index=False)
+    return hashes.groupby(ratings["User"].to_numpy()).sum()
+
+
+class RecommendationService:
+    """
+    Keeps recommendation models loaded between requests.
+
+    Models are loaded lazily for each (engine, metric) pair. Background thread
+    checks the questionnaire file every `poll_interval` seconds and when it
+    changes, loaded models are rebuilt and swapped - requests are answered by
+    the old models until the new ones are ready. K-means models are not
+    refitted when users were only added or updated, new and updated users are
+    assigned to the existing clusters (see `IncrementalClusters`). Latencies
+    of the last requests are kept to report percentiles.
+
+    Args:
+        data_path (str): Path to the questionnaire CSV file.
+        sparse (bool, default=False): Use sparse user-movie matrix.
+        poll_interval (float, default=2): Seconds between checks of the data file.
+        latency_window (int, default=10000): Number of latest requests used
+        for latency percentiles.
+    """
+
+    def __init__(self, data_path=DATA_PATH, sparse=False, poll_interval=2, latency_window=10000):
+        self.data_path = data_path
+        self.sparse = sparse
+        self.poll_interval = poll_interval
+        self.requests = 0
+        self.errors = 0
+        self.reloads = 0
+        self._latencies = deque(maxlen=latency_window)
+        self._models = {}
+        self._clusters = {}
+        self._digests = user_digests(load_ratings(data_path))
+        self._load_locks = {}
+        self._lock = threading.Lock()
+        self._data_mtime = os.stat(data_path).st_mtime
+        threading.Thread(target=self._watch_data, daemon=True).start()
+
+    def model(self, engine, metric):
+        """
+        Returns the user-movie matrix and model of the engine, loading them
+        on first use.
+        """
+        key = (engine, metric)
+        model = self._models.get(key)
+        if model is None:
+            # load under lock of the key, so slow first load doesn't block other models, `record` and `stats`
+            with self._lock:
+                load_lock = self._load_locks.setdefault(key, threading.Lock())
+            with load_lock:
+                model = self._models.get(key)
+                if model is None:
+                    model = load_engine(self.data_path, engine, metric, self.sparse)
+                    with self._lock:
+                        self._models[key] = model
+        return model
+
+    def recommend(self, user_id, engine="kmeans", metric="euclidean", top_n=5, enrich=True):
+        """
+        Returns recommendations and anti-recommendations of the user as
+        JSON serializable dictionary. Recommended movies are enriched with
+        genres and overview (from the title index or themoviedb) when
+        `enrich` is True.
+        """
+        user_movie_matrix, model = self.model(engine, metric)
+        if not 0 <= user_id < user_movie_matrix.shape[0]:
+            raise ValueError(f"Unknown user: {user_id}")
+        if engine == "item":
+            recommendations, anti_recommendations = recommend_similar_movies(
+                user_movie_matrix, model, user_id, top_n)
+        elif engine == "svd":
+            recommendations, anti_recommendations = recommend_factorized_movies(
+                user_movie_matrix, model, user_id, top_n)
+        else:
+            recommendations, anti_recommendations = recommend_movies(user_movie_matrix, model, user_id, top_n)
+
+        recommended = [{"title": str(title)} for title in recommendations]
+        if enrich:
+            for movie, (metadata, genres) in zip(recommended, lookup_titles(recommendations)):
+                movie["genres"] = genres
+                movie["overview"] = metadata["overview"] if metadata else None
+        return {
+            "user": str(user_movie_matrix.index[user_id]),
+            "engine": engine,
+            "metric": metric,
+            "recommendations": recommended,
+            "anti-recommendations": [str(title) for title in anti_recommendations]
+        }
+
+    def record(self, latency, error=False):
+        """
+        Records latency of handled request.
+        """
+        with self._lock:
+            self.requests += 1
+            self.errors += error
+            self._latencies.append(latency)
+
+    def stats(self):
+        """
+        Returns request counters and p50/p99 latency in milliseconds.
+        """
+        with self._lock:
+            latencies = np.array(self._latencies)
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "reloads": self.reloads,
+                "loaded_models": [f"{engine}/{metric}" for engine, metric in self._models],
+                "latency_p50_ms": float(np.percentile(latencies, 50) * 1000) if len(latencies) else None,
+                "latency_p99_ms": float(np.percentile(latencies, 99) * 1000) if len(latencies) else None
+            }
+
+    def _watch_data(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                mtime = os.stat(self.data_path).st_mtime
+            except OSError:
+                continue
+            if mtime == self._data_mtime:
+                continue
+            try:
+                ratings = load_ratings(self.data_path)
+                digests = user_digests(ratings)
+                models = {key: self._reload(key, ratings, digests) for key in list(self._models)}
+            except Exception as e:
+                print(f"Error reloading models: {e}")
+                continue
+            with self._lock:
+                self._models = models
+                self._digests = digests
+                self._data_mtime = mtime
+                self.reloads += 1
+
+    def _reload(self, key, ratings, digests):
+        engine, metric = key
+        if engine != "kmeans" or not self._digests.index.isin(digests.index).all():
+            self._clusters.pop(key, None)
+            return load_engine(self.data_path, engine, metric, self.sparse)
+        clusters = self._clusters.get(key)
+        if clusters is None:
+            clusters = self._clusters[key] = IncrementalClusters(*self._models[key], metric=metric)
+        common = digests.index.intersection(self._digests.index)
+        updated = common[digests[common].to_numpy() != self._digests[common].to_numpy()]
+        changed = digests.index.difference(common).append(updated)
+        if len(changed):
+            clusters.add_users(ratings[ratings["User"].isin(changed)])
+        return clusters.user_movie_matrix, clusters.kmeans
+
+
+def create_handler(service):
+    class RecommendationHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {name: values[0] for name, values in parse_qs(url.query).items()}
+            if url.path == "/stats":
+                self._send(200, service.stats())
+                return
+            if url.path != "/recommend":
+                self._send(404, {"error": "Not found"})
+                return
+
+            start = time.perf_counter()
+            try:
+                result = service.recommend(
+                    int(query["user"]),
+                    engine=query.get("engine", "kmeans"),
+                    metric=query.get("metric", "euclidean"),
+                    top_n=int(query.get("top_n", 5)),
+                    enrich=query.get("enrich", "1") != "0"
+                )
+                status = 200
+            except (KeyError, ValueError) as e:
+                result, status = {"error": f"Invalid request: {e}"}, 400
+            except Exception as e:
+                result, status = {"error": f"Error making recommendations: {e}"}, 500
+            service.record(time.perf_counter() - start, error=status != 200)
+            self._send(status, result)
+
+        def _send(self, status, body):
+            content = json.dumps(body, ensure_ascii=False).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            pass
+
+    return RecommendationHandler
+
+
+if __name__ == "__main__":
+    """
+    Local HTTP service answering recommendation requests with models kept in
+    memory between requests.
+
+    Endpoints:
+        GET /recommend?user=4&engine=kmeans&metric=cosine&top_n=5&enrich=1
+        GET /stats
+
+    Usage:
+        python server.py --port 8000
+    """
+    parser = argparse.ArgumentParser(description="Recommendation service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--data", default=default_data_path(), help="questionnaire CSV file or ratings store")
+    parser.add_argument("--sparse", action="store_true", help="use sparse user-movie matrix")
+    parser.add_argument("--preload", default="kmeans", help="comma separated engines loaded on startup")
+    args = parser.parse_args()
+
+    service = RecommendationService(args.data, args.sparse)
+    for engine in filter(None, args.preload.split(",")):
+        service.model(engine, "euclidean")
+    server = ThreadingHTTPServer((args.host, args.port), create_handler(service))
+    print(f"Serving recommendations on http://{args.host}:{args.port}")
+    server.serve_forever()
@@ -0,0 +1,96 @@
+import argparse
+import numpy as np
+import pandas as pd
+
+
+def generate_questionnaire(users, movies=500, min_ratings=5, max_ratings=41, zipf_exponent=1.0,
+                           seed=42, chunk_size=None):
+    """
+    Generates synthetic questionnaire in the same wide layout as
+    `resources/questionary_list.csv` (user, title, rating, title, rating...).
+
+    Popularity of movies follows Zipf distribution - movie of popularity rank
+    r is picked with probability proportional to 1 / r^`zipf_exponent`.
+    Every user rates random number (between `min_ratings` and `max_ratings`)
+    of distinct movies, sampled without replacement with Gumbel top-k trick
+    in chunks of users. Ratings (1-10) depend on movie quality, user bias and
+    noise, so users with similar taste exist.
+
+    Args:
+        users (int): Number of respondents.
+        movies (int, default=500): Size of the movie catalog.
+        min_ratings (int, default=5): Minimal number of ratings per user.
+        max_ratings (int, default=41): Maximal number of ratings per user.
+        zipf_exponent (float, default=1.0): Exponent of popularity distribution,
+        0 means uniform popularity.
+        seed (int, default=42): Seed of random generator.
+        chunk_size (int, default=None): Number of users sampled at once, by
+        default chosen so that a chunk has ~4M elements.
+
+    Returns:
+        pandas.DataFrame: Questionnaire without header, first column contains
+        user names, missing pairs are NaN.
+    """
+    rng = np.random.default_rng(seed)
+    max_ratings = min(max_ratings, movies)
+    min_ratings = min(min_ratings, max_ratings)
+    titles = np.array([f"Movie {i}" for i in range(movies)], dtype=object)
+    log_popularity = -zipf_exponent * np.log(np.arange(1, movies + 1))
+    quality = rng.normal(6, 1.5, size=movies)
+    if chunk_size is None:
+        chunk_size = max(1, (1 << 22) // movies)
+
+    movie_block = np.empty((users, max_ratings), dtype=object)
+    rating_block = np.empty((users, max_ratings))
+    for start in range(0, users, chunk_size):
+        count = min(chunk_size, users - start)
+        keys = log_popularity + rng.gumbel(size=(count, movies))
+        picked = np.argpartition(-keys, max_ratings - 1, axis=1)[:, :max_ratings]
+        picked = np.take_along_axis(picked, np.argsort(-np.take_along_axis(keys, picked, axis=1), axis=1), axis=1)
+        bias = rng.normal(0, 1, size=(count, 1))
+        ratings = np.clip(np.rint(quality[picked] + bias + rng.normal(0, 1.5, size=picked.shape)), 1, 10)
+        movie_block[start:start + count] = titles[picked]
+        rating_block[start:start + count] = ratings
+
+    rated_count = rng.integers(min_ratings, max_ratings + 1, size=users)
+    empty = np.arange(max_ratings) >= rated_count[:, None]
+    movie_block[empty] = np.nan
+    rating_block[empty] = np.nan
+
+    wide = np.empty((users, 2 * max_ratings + 1), dtype=object)
+    wide[:, 0] = [f"User {i}" for i in range(users)]
+    wide[:, 1::2] = movie_block
+    wide[:, 2::2] = rating_block
+    return pd.DataFrame(wide)
+
+
+def write_questionnaire(path, data):
+    """
+    Writes questionnaire to header-less CSV file, with "name" row at the top
+    as in `resources/questionary_list.csv`.
+    """
+    header = pd.DataFrame([["name"] + [np.nan] * (data.shape[1] - 1)])
+    pd.concat([header, data], ignore_index=True).to_csv(path, header=False, index=False)
+
+
+if __name__ == "__main__":
+    """
+    Writes synthetic questionnaire CSV file.
+
+    Usage:
+        python synthetic_data.py --users 10000 --movies 2000 --output resources/synthetic.csv
+    """
+    parser = argparse.ArgumentParser(description="Synthetic questionnaire generator")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--movies", type=int, default=500)
+    parser.add_argument("--min-ratings", type=int, default=5)
+    parser.add_argument("--max-ratings", type=int, default=41)
+    parser.add_argument("--zipf", type=float, default=1.0, help="exponent of movie popularity distribution")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="resources/synthetic.csv")
+    args = parser.parse_args()
+
+    data = generate_questionnaire(args.users, args.movies, args.min_ratings, args.max_ratings,
+                                  args.zipf, args.seed)
+    write_questionnaire(args.output, data)
+    print(f"Questionnaire of {args.users} users and {args.movies} movies written to {args.output}")
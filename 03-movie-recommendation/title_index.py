@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from data_fetcher import MAX_WORKERS, fetch_movie_object, fetch_movie_genres, get_movies_metadata
+
+INDEX_PATH = os.getenv('TMDB_TITLE_INDEX_PATH', 'cache/title_index.json')
+
+_loaded = {}
+
+
+def resolve_title(title):
+    """
+    Resolves title to compact index entry with themoviedb id, media type,
+    overview and genres.
+
+    Returns:
+        dict or None: Index entry, `None` if themoviedb has no match.
+
+    Raises:
+        requests.RequestException: If any request fails, so the title can be
+        resolved again later.
+    """
+    movie_object = fetch_movie_object(title)
+    if movie_object is None:
+        return None
+    return {
+        'id': movie_object['id'],
+        'media_type': movie_object['media_type'],
+        'overview': movie_object.get('overview', ''),
+        'genres': fetch_movie_genres(movie_object['id'], movie_object['media_type'])
+    }
+
+
+def resolve_titles(titles, max_workers=MAX_WORKERS):
+    """
+    Resolves many titles concurrently on bounded thread pool. Requests
+    limited by the API are retried with backoff (see `request_json`).
+
+    Args:
+        titles (list of str): Titles to resolve.
+        max_workers (int, default=MAX_WORKERS): Maximum number of concurrent
+        lookups.
+
+    Returns:
+        tuple: Dictionary of title to index entry (or `None` for titles
+        without match) and list of titles which failed to resolve.
+    """
+    def resolve(title):
+        try:
+            return title, resolve_title(title), None
+        except Exception as e:
+            return title, None, e
+
+    resolved, failed = {}, []
+    if not titles:
+        return resolved, failed
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(titles))) as executor:
+        for title, entry, error in executor.map(resolve, titles):
+            if error is None:
+                resolved[title] = entry
+            else:
+                print(f"Error resolving {title}: {error}")
+                failed.append(title)
+    return resolved, failed
+
+
+def load_title_index(path=INDEX_PATH):
+    """
+    Returns title index stored in `path`, empty when the file doesn't exist.
+    Loaded index is kept in memory until the file changes.
+    """
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return {}
+    loaded = _loaded.get(path)
+    if loaded is None or loaded[0] != mtime:
+        with open(path, encoding='utf-8') as file:
+            loaded = (mtime, json.load(file))
+        _loaded[path] = loaded
+    return loaded[1]
+
+
+def save_title_index(index, path=INDEX_PATH):
+    """
+    Writes title index to `path`. File is replaced atomically, so readers
+    never see partially written index.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(index, file, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def lookup_titles(titles, path=INDEX_PATH):
+    """
+    Returns metadata and genres of titles, read from title index with single
+    lookup per title. Titles missing from the index are fetched from
+    themoviedb (see `get_movies_metadata`).
+
+    Args:
+        titles (list of str): Titles of movies or TV shows.
+        path (str, default=INDEX_PATH): Path to the title index.
+
+    Returns:
+        list of tuple: Metadata (dict with "overview" or `None` if not found)
+        and list of genres for each title, in the same order as `titles`.
+    """
+    index = load_title_index(path)
+    missing = [title for title in titles if title not in index]
+    fetched = dict(zip(missing, get_movies_metadata(missing)))
+    result = []
+    for title in titles:
+        if title in fetched:
+            result.append(fetched[title])
+        else:
+            entry = index[title]
+            result.append((entry, entry['genres']) if entry else (None, []))
+    return result
+
+
+if __name__ == "__main__":
+    """
+    Resolves every distinct title of the questionnaire to themoviedb id, media
+    type, overview and genres and stores them in the title index. Titles
+    already in the index are skipped unless `--refresh` is given, titles which
+    failed are resolved on the next run.
+
+    Usage:
+        python title_index.py --data resources/questionary_list.csv --workers 8
+    """
+    from recomendation_engine import default_data_path, load_ratings
+
+    parser = argparse.ArgumentParser(description="Bulk title to themoviedb id resolver")
+    parser.add_argument("--data", default=default_data_path(), help="questionnaire CSV file or ratings store")
+    parser.add_argument("--output", default=INDEX_PATH, help="title index file")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="maximum concurrent lookups")
+    parser.add_argument("--refresh", action="store_true", help="resolve titles already in the index again")
+    args = parser.parse_args()
+
+    titles = load_ratings(args.data, ["Movie"])["Movie"].unique().tolist()
+    index = {} if args.refresh else dict(load_title_index(args.output))
+    pending = [title for title in titles if title not in index]
+    resolved, failed = resolve_titles(pending, args.workers)
+    index.update(resolved)
+    save_title_index(index, args.output)
+    not_found = sum(entry is None for entry in resolved.values())
+    print(f"{len(titles)} titles, {len(resolved)} resolved ({not_found} without match), "
+          f"{len(failed)} failed, index written to {args.output}")
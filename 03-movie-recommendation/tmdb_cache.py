@@ -0,0 +1,166 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class TMDBCache:
+    """
+    Two level cache for themoviedb responses.
+
+    Entries are kept in a small in-memory LRU dictionary that sits in front of
+    a SQLite database on disk, so responses survive between application runs.
+    Every entry has a time to live - expired entries are treated as missing
+    and removed. When the disk store grows above `max_entries` the least
+    recently used rows are evicted. Access times of memory hits are written
+    to disk in batch before eviction, so both levels share one recency order.
+
+    Args:
+        path (str): Location of the SQLite database file.
+        ttl (float): Time to live of a single entry in seconds.
+        max_entries (int): Maximum number of entries stored on disk.
+        memory_entries (int): Maximum number of entries kept in memory.
+
+    Example:
+        >>> cache = TMDBCache("cache/tmdb.sqlite", ttl=3600)
+        >>> cache.set(("search", "Whiplash", "pl-PL"), {"id": 244786})
+        >>> cache.get(("search", "Whiplash", "pl-PL"))
+        {'id': 244786}
+    """
+
+    def __init__(self, path, ttl=7 * 24 * 3600, max_entries=10000, memory_entries=256):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._accessed = {}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+        )
+        self._connection.commit()
+
+    @staticmethod
+    def make_key(*parts):
+        """
+        Builds a cache key from request parts, e.g. endpoint, query, language
+        and media id.
+        """
+        return json.dumps([str(part) for part in parts], ensure_ascii=False)
+
+    def get(self, parts, default=None):
+        """
+        Returns cached value for given request parts or `default` when there
+        is no fresh entry in memory nor on disk.
+        """
+        key = self.make_key(*parts)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if now - created_at <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self._accessed[key] = now
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+            row = self._connection.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+            value, created_at = json.loads(row[0]), row[1]
+            if now - created_at > self.ttl:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._connection.commit()
+                self.misses += 1
+                return default
+
+            self._connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._connection.commit()
+            self._remember(key, created_at, value)
+            self.disk_hits += 1
+            return value
+
+    def set(self, parts, value):
+        """
+        Stores JSON serializable `value` for given request parts.
+        """
+        key = self.make_key(*parts)
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now),
+            )
+            self._accessed.pop(key, None)
+            self._flush_accessed()
+            self._connection.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._connection.commit()
+            self._remember(key, now, value)
+
+    def clear(self):
+        """
+        Removes all entries from memory and disk.
+        """
+        with self._lock:
+            self._memory.clear()
+            self._accessed.clear()
+            self._connection.execute("DELETE FROM responses")
+            self._connection.commit()
+
+    def stats(self):
+        """
+        Returns dictionary with hit and miss counters of the cache.
+        """
+        with self._lock:
+            disk_entries = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "hits": self.memory_hits + self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+            }
+
+    def _flush_accessed(self):
+        self._connection.executemany(
+            "UPDATE responses SET accessed_at = ? WHERE key = ?",
+            [(accessed_at, key) for key, accessed_at in self._accessed.items()],
+        )
+        self._accessed.clear()
+
+    def _remember(self, key, created_at, value):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
@@ -1,4 +1,4 @@
-from data_fetcher import get_movie_object, get_movie_genres
+from title_index import lookup_titles
 
 def showRecomended(data):
     """
@@ -6,18 +6,18 @@ def showRecomended(data):
 
     This function takes a list of movie titles, retrieves additional metadata 
     for each movie, and displays the title, genres, and a brief overview.
+    Metadata is read from the title index built by `title_index.py`, only
+    titles missing from the index are fetched (concurrently) from themoviedb.
 
     Args:
     data (list) : A list of recommended movie titles.
         
     """
     print("Filmy rekomendowane: \n")
-    for title in data:
-        metadata = get_movie_object(title)
-        genres = get_movie_genres(metadata['id'], metadata['media_type'])
+    for title, (metadata, genres) in zip(data, lookup_titles(data)):
         print(title)
         print("Gatunki: " + ','.join(genres))
-        print("Opis: " + metadata['overview'])
+        print("Opis: " + (metadata['overview'] if metadata else ""))
         print()
 
 def showNotRecomended(data):
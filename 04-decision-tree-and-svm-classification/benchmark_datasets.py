@@ -0,0 +1,56 @@
+import argparse
+import contextlib
+import io
+import os
+import time
+from datasets import DATASETS, DATASET_CACHE_DIR
+
+
+def timed_load(loader, repeats):
+    """
+    Returns the loaded dataset and the best time of `repeats` loads. Output
+    printed by the loaders is suppressed.
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            X, y = loader()
+        best = min(best, time.perf_counter() - start)
+    return X, y, best
+
+
+def memory(X, y):
+    """
+    Returns memory used by the features and the target in bytes.
+    """
+    return X.memory_usage(deep=True).sum() + y.memory_usage(deep=True)
+
+
+if __name__ == "__main__":
+    """
+    Compares load time and memory of the datasets loaded from CSV with
+    preprocessing (the original loaders) and from the preprocessed dataset
+    cache (see `cached_dataset`). The first cached load builds the cache file,
+    it is measured separately.
+
+    Usage:
+        python benchmark_datasets.py --repeats 20
+    """
+    parser = argparse.ArgumentParser(description="Benchmark of the preprocessed dataset cache")
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'dataset':>10} {'CSV [ms]':>9} {'build [ms]':>11} {'cache [ms]':>11} {'speedup':>8} "
+          f"{'CSV [KiB]':>10} {'cache [KiB]':>12}")
+    for dataset_name, spec in DATASETS.items():
+        loader = spec['loader']
+        X_raw, y_raw, csv_seconds = timed_load(loader.__wrapped__, args.repeats)
+        for name in os.listdir(DATASET_CACHE_DIR) if os.path.isdir(DATASET_CACHE_DIR) else []:
+            if name.startswith(f"{loader.__name__}-"):
+                os.remove(os.path.join(DATASET_CACHE_DIR, name))
+        X, y, build_seconds = timed_load(loader, 1)
+        X, y, cache_seconds = timed_load(loader, args.repeats)
+        print(f"{dataset_name:>10} {csv_seconds * 1000:>9.2f} {build_seconds * 1000:>11.2f} "
+              f"{cache_seconds * 1000:>11.2f} {csv_seconds / cache_seconds:>7.1f}x "
+              f"{memory(X_raw, y_raw) / 1024:>10.1f} {memory(X, y) / 1024:>12.1f}")
@@ -0,0 +1,99 @@
+import argparse
+import time
+import warnings
+import numpy as np
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.model_selection import train_test_split
+from datasets import DATASETS
+from models import SVM_MODES, create_svm_model
+
+
+def scale_up(X, y, n_rows, noise=0.05, random_state=42):
+    """
+    Builds bigger copy of the dataset - rows are sampled with replacement and
+    gaussian noise (`noise` times standard deviation of the column) is added
+    to columns with more than two values, so rows aren't exact duplicates.
+
+    Parameters:
+    X : pandas.DataFrame
+        Feature set.
+    y : pandas.Series
+        Target variable.
+    n_rows : int
+        Number of rows of the copy.
+    noise : float, default=0.05
+        Relative amount of noise.
+    random_state : int, default=42
+        Seed of the sampling and the noise.
+
+    Returns:
+    X : pandas.DataFrame
+        Scaled-up feature set (float columns).
+    y : pandas.Series
+        Scaled-up target variable.
+    """
+    generator = np.random.default_rng(random_state)
+    rows = generator.integers(0, len(X), n_rows)
+    X_scaled = X.iloc[rows].reset_index(drop=True).astype(float)
+    for column in X.columns:
+        if X[column].nunique() > 2:
+            X_scaled[column] += generator.normal(0, noise * X[column].std(), n_rows)
+    return X_scaled, y.iloc[rows].reset_index(drop=True)
+
+
+def benchmark(model, X_train, y_train, X_test, y_test):
+    """
+    Fits the model and returns fit time, predict time and test accuracy.
+    """
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", ConvergenceWarning)
+        model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    predicted = model.predict(X_test)
+    predict_seconds = time.perf_counter() - start
+    return fit_seconds, predict_seconds, float(np.mean(predicted == y_test.to_numpy()))
+
+
+if __name__ == "__main__":
+    """
+    Compares fit time, predict time and accuracy of the SVM modes (see
+    `create_svm_model`) on scaled-up copies of the datasets. Training and test
+    parts are split from the original dataset before scaling up, so noisy
+    copies of test rows are never used for training. Exact `SVC` (modes
+    "exact" and "scaled") grows roughly quadratically with rows, it is skipped
+    above `--exact-max-rows`. "fourier" mode is skipped for kernels other than
+    rbf.
+
+    Usage:
+        python benchmark_svm.py --kernel rbf --rows 10000 100000 1000000
+        python benchmark_svm.py --datasets titanic --modes scaled nystroem fourier
+    """
+    parser = argparse.ArgumentParser(description="Benchmark of SVM modes on scaled-up datasets")
+    parser.add_argument("--datasets", nargs="+", choices=list(DATASETS), default=list(DATASETS))
+    parser.add_argument("--modes", nargs="+", choices=SVM_MODES, default=list(SVM_MODES))
+    parser.add_argument("--kernel", default="rbf", help="kernel of the SVM")
+    parser.add_argument("--rows", nargs="+", type=int, default=[10000, 100000, 1000000],
+                        help="rows of the scaled-up training sets")
+    parser.add_argument("--exact-max-rows", type=int, default=20000,
+                        help="skip exact SVC on bigger training sets")
+    args = parser.parse_args()
+
+    print(f"{'dataset':>10} {'rows':>9} {'mode':>9} {'fit [s]':>9} {'predict [s]':>12} {'accuracy':>9}")
+    for dataset_name in args.datasets:
+        X, y = DATASETS[dataset_name]['loader']()
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        for n_rows in args.rows:
+            X_train_scaled, y_train_scaled = scale_up(X_train, y_train, n_rows)
+            X_test_scaled, y_test_scaled = scale_up(X_test, y_test, n_rows // 4, random_state=43)
+            for mode in args.modes:
+                if (mode in ("exact", "scaled") and n_rows > args.exact_max_rows
+                        or mode == "fourier" and args.kernel != "rbf"):
+                    print(f"{dataset_name:>10} {n_rows:>9} {mode:>9} {'skipped':>9}")
+                    continue
+                fit_seconds, predict_seconds, accuracy = benchmark(create_svm_model(args.kernel, mode),
+                                                                   X_train_scaled, y_train_scaled,
+                                                                   X_test_scaled, y_test_scaled)
+                print(f"{dataset_name:>10} {n_rows:>9} {mode:>9} {fit_seconds:>9.2f} {predict_seconds:>12.2f} "
+                      f"{accuracy:>9.3f}", flush=True)
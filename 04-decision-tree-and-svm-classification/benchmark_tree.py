@@ -0,0 +1,87 @@
+import argparse
+import time
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.tree import DecisionTreeClassifier
+from benchmark_svm import scale_up
+from compiled_tree import CompiledTree
+from datasets import DATASETS
+from models import create_decision_tree_model
+
+
+def latency(function, record, repeats):
+    """
+    Returns median time of one call in microseconds.
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function(record)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1e6
+
+
+def check_parity(model, compiled, X):
+    """
+    Compares predictions of the compiled tree with sklearn on all rows, in
+    batch and row by row (as dicts for the first 1000 rows).
+
+    Returns:
+    int
+        Number of rows predicted differently.
+    """
+    expected = model.predict(X)
+    mismatches = int(np.sum(compiled.predict(X) != expected))
+    records = X.iloc[:1000].to_dict(orient="records")
+    mismatches += sum(compiled.predict_one(record) != label for record, label in zip(records, expected))
+    return mismatches
+
+
+if __name__ == "__main__":
+    """
+    Checks that the compiled decision tree (see `CompiledTree`) predicts the
+    same as sklearn - the tree used by `models.py` and a fully grown one, on
+    the test split and on scaled-up noisy copy of the dataset - and compares
+    latency of single row prediction and throughput of batch prediction.
+    Exits with error when any prediction differs.
+
+    Usage:
+        python benchmark_tree.py --rows 1000000 --repeats 2000
+    """
+    parser = argparse.ArgumentParser(description="Parity and latency of the compiled decision tree")
+    parser.add_argument("--rows", type=int, default=100000, help="rows of the scaled-up parity and batch set")
+    parser.add_argument("--repeats", type=int, default=1000, help="single row predictions measured")
+    args = parser.parse_args()
+
+    mismatches = 0
+    print(f"{'dataset':>10} {'tree':>6} {'depth':>6} {'sklearn [us]':>13} {'dict [us]':>10} {'array [us]':>11} "
+          f"{'sklearn [rows/s]':>17} {'batch [rows/s]':>15}")
+    for dataset_name, spec in DATASETS.items():
+        X, y = spec['loader']()
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        X_scaled, _ = scale_up(X, y, args.rows)
+        X_scaled = X_scaled.astype(X.dtypes.to_dict())
+        for tree_name, model in (("model", create_decision_tree_model()),
+                                 ("full", DecisionTreeClassifier(random_state=42))):
+            model.fit(X_train, y_train)
+            compiled = CompiledTree.from_model(model)
+            mismatches += check_parity(model, compiled, X_test) + check_parity(model, compiled, X_scaled)
+
+            row = X_test.iloc[:1]
+            record = row.iloc[0].to_dict()
+            values = row.to_numpy()[0]
+            start = time.perf_counter()
+            model.predict(X_scaled)
+            sklearn_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            compiled.predict(X_scaled)
+            batch_seconds = time.perf_counter() - start
+            print(f"{dataset_name:>10} {tree_name:>6} {compiled.depth:>6} "
+                  f"{latency(model.predict, row, args.repeats):>13.1f} "
+                  f"{latency(compiled.predict_one, record, args.repeats):>10.1f} "
+                  f"{latency(compiled.predict_one, values, args.repeats):>11.1f} "
+                  f"{args.rows / sklearn_seconds:>17.0f} {args.rows / batch_seconds:>15.0f}")
+
+    if mismatches:
+        raise SystemExit(f"{mismatches} predictions of the compiled tree differ from sklearn")
+    print("All predictions of the compiled tree match sklearn")
@@ -1,5 +1,107 @@
+import numpy as np
 import pandas as pd
 
+class RecordSchema:
+    """
+    Training-time schema of the features, used to turn raw records into the
+    feature matrix the models were trained on.
+
+    Raw records may contain text categories (e.g. 'Sex': 'male'), columns to
+    be one-hot encoded (e.g. 'Embarked': 'S'), zeros meaning missing value or
+    missing values. They are mapped, encoded and filled the same way as the
+    training data, then columns are put in the training order - dummy columns
+    of categories absent from the batch are False, unknown columns are dropped.
+
+    Parameters:
+    columns : list of str
+        Feature columns in the training order.
+    mappings : dict, default=None
+        Mapping of text values to codes for each column.
+    dummies : list of str, default=None
+        Columns one-hot encoded during training.
+    zero_as_missing : list of str, default=None
+        Columns where 0 means missing value.
+    fill_values : dict, default=None
+        Values used for missing values of each column (e.g. training medians), for one-hot
+        encoded columns they are filled before encoding (e.g. with training mode).
+    """
+
+    def __init__(self, columns, mappings=None, dummies=None, zero_as_missing=None, fill_values=None):
+        self.columns = list(columns)
+        self.mappings = mappings or {}
+        self.dummies = dummies or []
+        self.zero_as_missing = zero_as_missing or []
+        self.fill_values = fill_values or {}
+
+    @classmethod
+    def from_training(cls, X, mappings=None, dummies=None, zero_as_missing=None):
+        """
+        Creates schema of the training features `X`, missing values are filled with medians of `X`.
+        """
+        return cls(X.columns, mappings, dummies, zero_as_missing, X.median(numeric_only=True).to_dict())
+
+    def transform(self, records):
+        """
+        Converts records to the training feature matrix.
+
+        Parameters:
+        records : pandas.DataFrame, list of dict or numpy.ndarray
+            Raw records, array rows must already be encoded and in the training column order.
+
+        Returns:
+        pandas.DataFrame
+            Features with the training columns.
+        """
+        if isinstance(records, np.ndarray):
+            data = pd.DataFrame(records, columns=self.columns)
+        else:
+            data = pd.DataFrame(records)
+        for column, mapping in self.mappings.items():
+            if column in data and not pd.api.types.is_numeric_dtype(data[column]):
+                data[column] = data[column].map(mapping)
+        zero_as_missing = [column for column in self.zero_as_missing if column in data]
+        data[zero_as_missing] = data[zero_as_missing].replace(0, np.nan)
+        for column in self.dummies:
+            if column in data and column in self.fill_values:
+                data[column] = data[column].fillna(self.fill_values[column])
+        data = pd.get_dummies(data, columns=[column for column in self.dummies if column in data])
+
+        data = data.reindex(columns=self.columns)
+        dummy_columns = [column for column in self.columns
+                         if any(column.startswith(f"{dummy}_") for dummy in self.dummies)]
+        data[dummy_columns] = data[dummy_columns].astype("boolean").fillna(False).astype(bool)
+        return data.fillna(self.fill_values)
+
+def predict_batch(models, records, schema=None):
+    """
+    Predicts all records with every model - records are converted to the
+    training features once and each model is called once for the whole batch.
+
+    Parameters:
+    models : dict
+        Trained models by name.
+    records : pandas.DataFrame, list of dict or numpy.ndarray
+        Records to predict (see `RecordSchema.transform`).
+    schema : RecordSchema, default=None
+        Training schema, by default only the training columns of the first model.
+
+    Returns:
+    dict
+        Array of predictions for each model name.
+    """
+    if schema is None:
+        schema = RecordSchema(next(iter(models.values())).feature_names_in_)
+    X = schema.transform(records)
+    return {name: model.predict(X) for name, model in models.items()}
+
+def print_predictions(predictions, positive, negative, suffix):
+    """
+    Prints predictions of each model for every person, e.g. "SVC prediction for person1: Will survive".
+    """
+    for name, model_predictions in predictions.items():
+        for number, prediction in enumerate(model_predictions, 1):
+            print(f"{name} prediction for person{number}: " + (positive if prediction == 1 else negative) + suffix)
+
 def invoke_classifiers_with_titanic_data(svm_model, decision_tree_model):
     """
     Uses given machine learning models to make predictions about surviving
@@ -7,7 +109,8 @@ def invoke_classifiers_with_titanic_data(svm_model, decision_tree_model):
     parameters.
 
     The function defines two hypothetical individuals (person1 and person2) and
-    prints result of predictions
+    prints result of predictions. Both individuals are predicted by each model
+    in one call (see `predict_batch`).
 
     Parameters:
     svm_model : sklearn.svm.SVC
@@ -16,35 +119,29 @@ def invoke_classifiers_with_titanic_data(svm_model, decision_tree_model):
         A trained decision tree classifier model for predicting survivability.
     """
     person1 = {
-        'Pclass': [3],
-        'Sex': [0],
-        'Age': [28.0],
-        'SibSp': [1],
-        'Parch': [1],
-        'Fare': [15.2458],
-        'Embarked_C': [False],
-        'Embarked_Q': [False],
-        'Embarked_S': [True]
+        'Pclass': 3,
+        'Sex': 0,
+        'Age': 28.0,
+        'SibSp': 1,
+        'Parch': 1,
+        'Fare': 15.2458,
+        'Embarked_C': False,
+        'Embarked_Q': False,
+        'Embarked_S': True
     }
     person2 = {
-        'Pclass': [3],
-        'Sex': [1],
-        'Age': [28.0],
-        'SibSp': [1],
-        'Parch': [1],
-        'Fare': [15.2458],
-        'Embarked_C': [False],
-        'Embarked_Q': [False],
-        'Embarked_S': [True]
+        'Pclass': 3,
+        'Sex': 1,
+        'Age': 28.0,
+        'SibSp': 1,
+        'Parch': 1,
+        'Fare': 15.2458,
+        'Embarked_C': False,
+        'Embarked_Q': False,
+        'Embarked_S': True
     }
-    print("SVC prediction for person1: " + (
-        "Will" if svm_model.predict(pd.DataFrame(person1)) == 1 else "Won't") + " survive")
-    print("SVC prediction for person2: " + (
-        "Will" if svm_model.predict(pd.DataFrame(person2)) == 1 else "Won't") + " survive")
-    print("Decision tree prediction for person1: " + (
-        "Will" if decision_tree_model.predict(pd.DataFrame(person1)) == 1 else "Won't") + " survive")
-    print("Decision tree prediction for person2: " + (
-        "Will" if decision_tree_model.predict(pd.DataFrame(person2)) == 1 else "Won't") + " survive")
+    predictions = predict_batch({"SVC": svm_model, "Decision tree": decision_tree_model}, [person1, person2])
+    print_predictions(predictions, "Will", "Won't", " survive")
 
 def invoke_classifiers_with_pima_indians_data(svm_model, decision_tree_model):
     """
@@ -52,7 +149,8 @@ def invoke_classifiers_with_pima_indians_data(svm_model, decision_tree_model):
     diabetis of two individuals based on their health data.
 
     The function defines two hypothetical individuals (person1 and person2) and
-    prints result of predictions
+    prints result of predictions. Both individuals are predicted by each model
+    in one call (see `predict_batch`).
 
     Parameters:
     svm_model : sklearn.svm.SVC
@@ -61,33 +159,27 @@ def invoke_classifiers_with_pima_indians_data(svm_model, decision_tree_model):
         A trained decision tree classifier model for predicting diabetis.
     """
     person1 = {
-        'Pregnancies': [2],
-        'Glucose': [84.0],
-        'BloodPressure': [72.0],
-        'SkinThickness': [35.0],
-        'Insulin': [0.0],
-        'BMI': [32.3],
-        'DiabetesPedigreeFunction': [0.304],
-        'Age': [21]
+        'Pregnancies': 2,
+        'Glucose': 84.0,
+        'BloodPressure': 72.0,
+        'SkinThickness': 35.0,
+        'Insulin': 0.0,
+        'BMI': 32.3,
+        'DiabetesPedigreeFunction': 0.304,
+        'Age': 21
     }
     person2 = {
-        'Pregnancies': [2],
-        'Glucose': [140.0],
-        'BloodPressure': [72.0],
-        'SkinThickness': [35.0],
-        'Insulin': [270.0],
-        'BMI': [38.0],
-        'DiabetesPedigreeFunction': [0.304],
-        'Age': [51]
+        'Pregnancies': 2,
+        'Glucose': 140.0,
+        'BloodPressure': 72.0,
+        'SkinThickness': 35.0,
+        'Insulin': 270.0,
+        'BMI': 38.0,
+        'DiabetesPedigreeFunction': 0.304,
+        'Age': 51
     }
-    print("Decision tree prediction for person1: " + (
-        "Has" if decision_tree_model.predict(pd.DataFrame(person1)) == 1 else "Doesn't have") + " diabetes")
-    print("Decision tree prediction for person2: " + (
-        "Has" if decision_tree_model.predict(pd.DataFrame(person2)) == 1 else "Doesn't have") + " diabetes")
-    print("SVC prediction for person1: " + (
-        "Has" if svm_model.predict(pd.DataFrame(person1)) == 1 else "Doesn't have") + " diabetes")
-    print("SVC prediction for person2: " + (
-        "Has" if svm_model.predict(pd.DataFrame(person2)) == 1 else "Doesn't have") + " diabetes")
+    predictions = predict_batch({"Decision tree": decision_tree_model, "SVC": svm_model}, [person1, person2])
+    print_predictions(predictions, "Has", "Doesn't have", " diabetes")
 
 def invoke_classifiers_with_survey_data(svm_model, decision_tree_model):
     """
@@ -95,7 +187,8 @@ def invoke_classifiers_with_survey_data(svm_model, decision_tree_model):
     at work of two individuals based on their survey data.
 
     The function defines two hypothetical individuals (person1 and person2) and
-    prints result of predictions
+    prints result of predictions. Both individuals are predicted by each model
+    in one call (see `predict_batch`).
 
     Parameters:
     svm_model : sklearn.svm.SVC
@@ -104,20 +197,14 @@ def invoke_classifiers_with_survey_data(svm_model, decision_tree_model):
         A trained decision tree classifier model for predicting happiness.
     """
     person1 = {
-        'Sex': [0],
-        'Age': [29.0],
-        'EducationLevel': [4]
+        'Sex': 0,
+        'Age': 29.0,
+        'EducationLevel': 4
     }
     person2 = {
-        'Sex': [1],
-        'Age': [32.0],
-        'EducationLevel': [5]
+        'Sex': 1,
+        'Age': 32.0,
+        'EducationLevel': 5
     }
-    print("Decision tree prediction for person1: " + (
-        "Is" if decision_tree_model.predict(pd.DataFrame(person1)) == 1 else "Isn't") + " happy")
-    print("Decision tree prediction for person2: " + (
-        "Is" if decision_tree_model.predict(pd.DataFrame(person2)) == 1 else "Isn't") + " happy")
-    print("SVC prediction for person1: " + (
-        "Is" if svm_model.predict(pd.DataFrame(person1)) == 1 else "Isn't") + " happy")
-    print("SVC prediction for person2: " + (
-        "Is" if svm_model.predict(pd.DataFrame(person2)) == 1 else "Isn't") + " happy")
+    predictions = predict_batch({"Decision tree": decision_tree_model, "SVC": svm_model}, [person1, person2])
+    print_predictions(predictions, "Is", "Isn't", " happy")
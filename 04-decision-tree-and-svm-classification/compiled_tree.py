@@ -0,0 +1,123 @@
+import numpy as np
+
+class CompiledTree:
+    """
+    Fitted decision tree compiled to flat arrays, predicts without sklearn
+    input validation and DataFrame construction.
+
+    Node `i` is a split on feature `feature[i]`: rows with the value lower or
+    equal to `threshold[i]` go to `left[i]`, others to `right[i]`. Leaves point
+    to themselves and `value[i]` is the index of the predicted class in
+    `classes`. As in sklearn, values are compared as float32.
+
+    Parameters:
+    feature : numpy.ndarray
+        Feature index of each node.
+    threshold : numpy.ndarray
+        Split threshold of each node.
+    left : numpy.ndarray
+        Left child of each node.
+    right : numpy.ndarray
+        Right child of each node.
+    value : numpy.ndarray
+        Index of the predicted class of each node.
+    classes : numpy.ndarray
+        Class labels.
+    feature_names : list of str
+        Names of the features in the training order.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, classes, feature_names):
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.intp)
+        self.right = np.asarray(right, dtype=np.intp)
+        self.value = np.asarray(value, dtype=np.intp)
+        self.classes = np.asarray(classes)
+        self.feature_names = [str(name) for name in feature_names]
+        self.depth = self._depth()
+        # Python lists are much faster than NumPy arrays for single row traversal
+        self._nodes = list(zip(self.feature.tolist(), self.threshold.tolist(), self.left.tolist(),
+                               self.right.tolist()))
+        self._labels = [self.classes[index] for index in self.value]
+
+    @classmethod
+    def from_model(cls, decision_tree_model, feature_names=None):
+        """
+        Compiles fitted `DecisionTreeClassifier`. Feature names are taken from
+        the model when it was trained on DataFrame.
+        """
+        tree = decision_tree_model.tree_
+        if feature_names is None:
+            feature_names = getattr(decision_tree_model, "feature_names_in_", range(tree.n_features))
+        leaves = tree.children_left == -1
+        nodes = np.arange(tree.node_count)
+        return cls(np.where(leaves, 0, tree.feature), tree.threshold,
+                   np.where(leaves, nodes, tree.children_left), np.where(leaves, nodes, tree.children_right),
+                   tree.value[:, 0, :].argmax(axis=1), decision_tree_model.classes_, feature_names)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads tree saved by `save`.
+        """
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls(arrays["feature"], arrays["threshold"], arrays["left"], arrays["right"], arrays["value"],
+                       arrays["classes"], arrays["feature_names"].tolist())
+
+    def save(self, path):
+        """
+        Saves the arrays to NPZ file.
+        """
+        np.savez(path, feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+                 value=self.value, classes=self.classes, feature_names=np.array(self.feature_names))
+
+    def predict_one(self, record):
+        """
+        Predicts one record.
+
+        Parameters:
+        record : dict or sequence
+            Encoded features by name (training columns) or values in the training order.
+
+        Returns:
+        Predicted class label.
+        """
+        if isinstance(record, dict):
+            record = [record[name] for name in self.feature_names]
+        x = np.asarray(record, dtype=np.float32).tolist()
+        node = 0
+        feature, threshold, left, right = self._nodes[node]
+        while left != node:
+            node = left if x[feature] <= threshold else right
+            feature, threshold, left, right = self._nodes[node]
+        return self._labels[node]
+
+    def predict(self, X):
+        """
+        Predicts all rows at once - every row moves one level down the tree in
+        each vectorized step.
+
+        Parameters:
+        X : pandas.DataFrame or numpy.ndarray
+            Features in the training order.
+
+        Returns:
+        numpy.ndarray
+            Predicted class labels.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))
+        nodes = np.zeros(len(X), dtype=np.intp)
+        # leaves point to themselves, so rows which reached leaf stay there
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return self.classes[self.value[nodes]]
+
+    def _depth(self):
+        depth = np.zeros(len(self.feature), dtype=np.intp)
+        for node in range(len(self.feature)):
+            if self.left[node] != node:
+                depth[self.left[node]] = depth[self.right[node]] = depth[node] + 1
+        return int(depth.max())
@@ -1,7 +1,97 @@
+import functools
+import os
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+from pyarrow import ipc
 from sklearn.impute import SimpleImputer
+from model_cache import dataset_hash
 
+PIMA_INDIANS_PATH = "resources/pima-indians-diabetes.csv"
+TITANIC_PATH = "resources/titanic.csv"
+SURVEY_PATH = "resources/job-satisfaction-survey.csv"
+SEX_MAPPING = {'male': 0, 'female': 1}
+FEATURES_WITH_MISSING = ['Glucose', 'BloodPressure', 'SkinThickness', 'Insulin', 'BMI']
+PIMA_INDIANS_COLUMNS = ['Pregnancies', 'Glucose', 'BloodPressure', 'SkinThickness',
+                        'Insulin', 'BMI', 'DiabetesPedigreeFunction', 'Age', 'Outcome']
+TITANIC_DROPPED_COLUMNS = ['PassengerId', 'Name', 'Ticket', 'Cabin']
+SURVEY_DROPPED_COLUMNS = ['SurveyedId']
+DATASET_CACHE_DIR = os.getenv('DATASET_CACHE_DIR', 'cache/datasets')
+
+def compact_dtypes(data):
+    """
+    Downcasts columns of preprocessed dataset to compact dtypes: flags (bool
+    or only 0/1 values) to int8, other integers to the smallest integer type,
+    floats to float32 and text to categoricals. Boolean target keeps its
+    dtype, so class labels don't change.
+
+    Parameters:
+    data : pandas.DataFrame or pandas.Series
+        Features or target variable.
+
+    Returns:
+    pandas.DataFrame or pandas.Series
+        Data with downcast columns.
+    """
+    if isinstance(data, pd.Series):
+        if data.dtype == bool:
+            return data
+        return compact_dtypes(data.to_frame())[data.name]
+    columns = {}
+    for column, values in data.items():
+        if values.dtype == bool or (pd.api.types.is_integer_dtype(values) and values.isin([0, 1]).all()):
+            columns[column] = values.astype(np.int8)
+        elif pd.api.types.is_integer_dtype(values):
+            columns[column] = pd.to_numeric(values, downcast='integer')
+        elif pd.api.types.is_float_dtype(values):
+            columns[column] = values.astype(np.float32)
+        elif values.dtype == object:
+            columns[column] = values.astype('category')
+        else:
+            columns[column] = values
+    return pd.DataFrame(columns, index=data.index)
+
+def cached_dataset(path):
+    """
+    Decorator caching preprocessed output of dataset loader.
+
+    The first call runs the loader, downcasts its output (see
+    `compact_dtypes`) and stores it as Arrow IPC file in `DATASET_CACHE_DIR`,
+    next calls read the file memory-mapped instead of parsing the CSV and
+    preprocessing it again. The file is named by `dataset_hash` - hash of the
+    dataset file and source code of this module (the loader, `compact_dtypes`
+    and the column lists), so it is rebuilt when any of them changes. The
+    original loader is available as `__wrapped__`.
+
+    Parameters:
+    path : str
+        Path to the dataset file read by the loader.
+    """
+    def decorator(loader):
+        @functools.wraps(loader)
+        def load():
+            cache_path = os.path.join(DATASET_CACHE_DIR, f"{loader.__name__}-{dataset_hash(loader, path)[:32]}.arrow")
+            if os.path.exists(cache_path):
+                try:
+                    data = ipc.open_file(pa.memory_map(cache_path)).read_pandas()
+                    target = data.columns[-1]
+                    return data.drop(columns=target), data[target]
+                except Exception as e:
+                    print(f"Error loading dataset cache {cache_path}: {e}")
+
+            X, y = loader()
+            X, y = compact_dtypes(X), compact_dtypes(y)
+            table = pa.Table.from_pandas(X.assign(**{y.name: y}), preserve_index=False)
+            os.makedirs(DATASET_CACHE_DIR, exist_ok=True)
+            temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+            with ipc.new_file(temporary_path, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(temporary_path, cache_path)
+            return X, y
+        return load
+    return decorator
+
+@cached_dataset(PIMA_INDIANS_PATH)
 def load_pima_indian_dataset():
     """
     Loads and preprocesses the Pima Indians Diabetes dataset for machine learning tasks.
@@ -18,18 +108,16 @@ def load_pima_indian_dataset():
     y : pandas.Series
         The target variable, indicating outcome (1 for have diabetis, 0 for not have diabetis).
     """
-    columns = ['Pregnancies', 'Glucose', 'BloodPressure', 'SkinThickness',
-               'Insulin', 'BMI', 'DiabetesPedigreeFunction', 'Age', 'Outcome']
-    data = pd.read_csv("resources/pima-indians-diabetes.csv", names=columns)
+    data = pd.read_csv(PIMA_INDIANS_PATH, names=PIMA_INDIANS_COLUMNS)
 
-    features_with_missing = ['Glucose', 'BloodPressure', 'SkinThickness', 'Insulin', 'BMI']
-    data[features_with_missing] = data[features_with_missing].replace(0, np.nan)
+    data[FEATURES_WITH_MISSING] = data[FEATURES_WITH_MISSING].replace(0, np.nan)
     imputer = SimpleImputer(strategy='median')
-    data[features_with_missing] = imputer.fit_transform(data[features_with_missing])
+    data[FEATURES_WITH_MISSING] = imputer.fit_transform(data[FEATURES_WITH_MISSING])
     X = data.drop('Outcome', axis=1)
     y = data['Outcome']
     return X, y
 
+@cached_dataset(TITANIC_PATH)
 def load_titanic_dataset():
     """
     Loads and preprocesses the Titanic dataset for machine learning tasks.
@@ -48,19 +136,20 @@ def load_titanic_dataset():
     y : pandas.Series
         The target variable, indicating survival (1 for survived, 0 for did not survive).
     """
-    data = pd.read_csv('resources/titanic.csv')
-    data = data.drop(['PassengerId', 'Name', 'Ticket', 'Cabin'], axis=1)
+    data = pd.read_csv(TITANIC_PATH)
+    data = data.drop(TITANIC_DROPPED_COLUMNS, axis=1)
 
     data['Age'] = data['Age'].fillna(data['Age'].median())
     data['Embarked'] = data['Embarked'].fillna(data['Embarked'].mode()[0])
 
-    data['Sex'] = data['Sex'].map({'male': 0, 'female': 1})
+    data['Sex'] = data['Sex'].map(SEX_MAPPING)
     data = pd.get_dummies(data, columns=['Embarked']) # hot-one encoding
 
     X = data.drop('Survived', axis=1)
     y = data['Survived']
     return X, y
 
+@cached_dataset(SURVEY_PATH)
 def load_survey_dataset():
     """
     Loads and preprocesses the job satisfaction survey dataset for machine learning tasks.
@@ -77,11 +166,38 @@ def load_survey_dataset():
         The target variable, indicating satisfaction (1 for satisfied, 0 for not satisfied).
     """
      
-    data = pd.read_csv('resources/job-satisfaction-survey.csv')
-    data = data.drop(['SurveyedId'], axis=1)
-    data['Sex'] = data['Sex'].map({'male': 0, 'female': 1})
+    data = pd.read_csv(SURVEY_PATH)
+    data = data.drop(SURVEY_DROPPED_COLUMNS, axis=1)
+    data['Sex'] = data['Sex'].map(SEX_MAPPING)
 
     X = data.drop('Satisfied', axis=1)
     print(X)
     y = data['Satisfied']
     return X, y
+
+# Loader, file, layout of the raw file (header names when the file has none, dropped columns, target)
+# and preprocessing of raw records (see `RecordSchema`) of each dataset
+DATASETS = {
+    'survey': {
+        'loader': load_survey_dataset,
+        'path': SURVEY_PATH,
+        'drop': SURVEY_DROPPED_COLUMNS,
+        'target': 'Satisfied',
+        'mappings': {'Sex': SEX_MAPPING}
+    },
+    'diabetis': {
+        'loader': load_pima_indian_dataset,
+        'path': PIMA_INDIANS_PATH,
+        'names': PIMA_INDIANS_COLUMNS,
+        'target': 'Outcome',
+        'zero_as_missing': FEATURES_WITH_MISSING
+    },
+    'titanic': {
+        'loader': load_titanic_dataset,
+        'path': TITANIC_PATH,
+        'drop': TITANIC_DROPPED_COLUMNS,
+        'target': 'Survived',
+        'mappings': {'Sex': SEX_MAPPING},
+        'dummies': ['Embarked']
+    }
+}
@@ -0,0 +1,217 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.svm import SVC
+from sklearn.tree import DecisionTreeClassifier
+from datasets import DATASETS
+from model_cache import dataset_hash
+
+SEARCH_CACHE_DIR = os.getenv('SEARCH_CACHE_DIR', 'cache/search')
+ESTIMATORS = {"svm": SVC, "decision_tree": DecisionTreeClassifier}
+# Some kernels on unscaled features (e.g. poly with gamma=0.1 on titanic) don't converge for hours,
+# such SVMs are stopped after this many iterations
+SVM_MAX_ITER = 1000000
+
+_datasets = {}
+
+
+def parameter_grid(model_name):
+    """
+    Returns list of hyperparameter sets searched for the model.
+    """
+    if model_name == "svm":
+        grid = [{"kernel": "linear", "C": C} for C in (0.1, 1, 10)]
+        grid += [{"kernel": kernel, "C": C, "gamma": gamma}
+                 for kernel, C, gamma in itertools.product(("rbf", "poly", "sigmoid"), (0.1, 1, 10),
+                                                           ("scale", 0.01, 0.1))]
+        return grid
+    return [{"max_depth": max_depth, "min_samples_split": min_samples_split, "min_samples_leaf": min_samples_leaf}
+            for max_depth, min_samples_split, min_samples_leaf
+            in itertools.product((2, 3, 4, 6, 8, None), (2, 10, 20), (1, 5))]
+
+
+def training_split(dataset_name):
+    """
+    Returns training part of the dataset (the same split as in `models.py`,
+    test part is not used by the search), loaded once per process.
+    """
+    if dataset_name not in _datasets:
+        X, y = DATASETS[dataset_name]['loader']()
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        _datasets[dataset_name] = (X_train.to_numpy(dtype=float), y_train.to_numpy())
+    return _datasets[dataset_name]
+
+
+def fold_key(dataset, model_name, params, n_samples, fold, n_folds):
+    description = json.dumps({'dataset': dataset, 'model': model_name, 'params': params, 'n_samples': n_samples,
+                              'fold': fold, 'n_folds': n_folds, 'max_iter': SVM_MAX_ITER}, sort_keys=True)
+    return hashlib.sha256(description.encode()).hexdigest()[:32]
+
+
+def evaluate_fold(dataset_name, model_name, params, n_samples, fold, n_folds):
+    """
+    Trains the model with given hyperparameters on one cross-validation fold
+    of the first `n_samples` training rows and returns its validation
+    accuracy and training time. SVMs are limited to `SVM_MAX_ITER`
+    iterations.
+    """
+    X, y = training_split(dataset_name)
+    X, y = X[:n_samples], y[:n_samples]
+    splits = StratifiedKFold(n_folds, shuffle=True, random_state=42).split(X, y)
+    train, validation = next(itertools.islice(splits, fold, None))
+    if model_name == "svm":
+        params = {**params, "max_iter": SVM_MAX_ITER}
+    model = ESTIMATORS[model_name](random_state=42, **params)
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", ConvergenceWarning)
+        model.fit(X[train], y[train])
+    fit_seconds = time.perf_counter() - start
+    return {"accuracy": float(np.mean(model.predict(X[validation]) == y[validation])), "fit_seconds": fit_seconds}
+
+
+def evaluate_candidates(executor, dataset_name, model_name, candidates, n_samples, n_folds, dataset):
+    """
+    Evaluates every candidate with cross-validation on `n_samples` rows.
+    Fold results are read from and written to `SEARCH_CACHE_DIR`, so only
+    folds not evaluated before are computed, in parallel on `executor`.
+
+    Returns:
+    tuple
+        List of mean accuracy and mean training time of each candidate and
+        number of folds read from the cache.
+    """
+    tasks = [(candidate, fold) for candidate in candidates for fold in range(n_folds)]
+    keys = [fold_key(dataset, model_name, candidate, n_samples, fold, n_folds) for candidate, fold in tasks]
+    paths = [os.path.join(SEARCH_CACHE_DIR, f"{key}.json") for key in keys]
+    results = {}
+    for task_index, path in enumerate(paths):
+        if os.path.exists(path):
+            with open(path) as file:
+                results[task_index] = json.load(file)
+    cached = len(results)
+
+    pending = [task_index for task_index in range(len(tasks)) if task_index not in results]
+    futures = {executor.submit(evaluate_fold, dataset_name, model_name, tasks[task_index][0], n_samples,
+                               tasks[task_index][1], n_folds): task_index
+               for task_index in pending}
+    os.makedirs(SEARCH_CACHE_DIR, exist_ok=True)
+    # every fold is written as soon as it finishes, so interrupted search loses only the running folds
+    for future in as_completed(futures):
+        task_index = futures[future]
+        results[task_index] = future.result()
+        with open(f"{paths[task_index]}.tmp", "w") as file:
+            json.dump(results[task_index], file)
+        os.replace(f"{paths[task_index]}.tmp", paths[task_index])
+
+    scores = []
+    for candidate_index in range(len(candidates)):
+        folds = [results[candidate_index * n_folds + fold] for fold in range(n_folds)]
+        scores.append((float(np.mean([result["accuracy"] for result in folds])),
+                       float(np.mean([result["fit_seconds"] for result in folds]))))
+    return scores, cached
+
+
+def successive_halving(dataset_name, model_name, candidates, n_folds=5, eta=3, min_samples=None, workers=None):
+    """
+    Searches hyperparameters with successive halving. All candidates are
+    evaluated on small part of the training data, then only the best 1/`eta`
+    of them are evaluated on `eta` times more rows, until all training rows
+    are used. The last round keeps at least `eta` candidates. With
+    `min_samples` equal to number of training rows it is a plain grid search.
+
+    Parameters:
+    dataset_name : str
+        Name of the dataset in `DATASETS`.
+    model_name : str
+        "svm" or "decision_tree".
+    candidates : list of dict
+        Hyperparameter sets.
+    n_folds : int, default=5
+        Number of cross-validation folds.
+    eta : int, default=3
+        Fraction of candidates kept and growth of rows in every round.
+    min_samples : int, default=None
+        Rows used in the first round, chosen so that the last round uses all
+        training rows by default.
+    workers : int, default=None
+        Number of processes, number of CPUs by default.
+
+    Returns:
+    list of dict
+        Candidates of the last round with their mean accuracy, training time
+        and accuracy per training second, sorted by accuracy.
+    """
+    X, y = training_split(dataset_name)
+    spec = DATASETS[dataset_name]
+    dataset = dataset_hash(spec['loader'], spec['path'])
+    # the last round keeps at least `eta` candidates to compare
+    rounds = 1 + max(0, int(np.floor(np.log(len(candidates) / eta) / np.log(eta))))
+    if min_samples is None:
+        min_samples = -(-len(y) // eta ** (rounds - 1))
+    min_samples = max(min_samples, 2 * n_folds)
+
+    with ProcessPoolExecutor(workers) as executor:
+        n_samples = min(min_samples, len(y))
+        while True:
+            scores, cached = evaluate_candidates(executor, dataset_name, model_name, candidates, n_samples,
+                                                 n_folds, dataset)
+            print(f"{model_name}: {len(candidates)} candidates on {n_samples} rows "
+                  f"({cached} of {len(candidates) * n_folds} folds from cache)")
+            ranked = sorted(zip(candidates, scores), key=lambda item: -item[1][0])
+            if n_samples >= len(y) or len(candidates) <= 1:
+                break
+            candidates = [candidate for candidate, _ in ranked[:max(1, len(candidates) // eta)]]
+            n_samples = min(n_samples * eta, len(y))
+
+    return [{"params": candidate, "accuracy": accuracy, "fit_seconds": fit_seconds,
+             "accuracy_per_second": accuracy / max(fit_seconds, 1e-6)}
+            for candidate, (accuracy, fit_seconds) in ranked]
+
+
+if __name__ == "__main__":
+    """
+    Parallel hyperparameter search of the SVM (kernel, C, gamma) and the
+    decision tree (max_depth, min_samples_split, min_samples_leaf) with
+    successive halving and cross-validation on the training split. Results of
+    every fold are cached in `cache/search`, so interrupted or repeated
+    searches continue where they stopped. Prints the most accurate
+    configurations and the ones with the best accuracy per training second.
+
+    Usage:
+        python hyperparameter_search.py titanic --models svm decision_tree --workers 4
+        python hyperparameter_search.py diabetis --grid
+    """
+    parser = argparse.ArgumentParser(description="Hyperparameter search")
+    parser.add_argument("dataset", choices=list(DATASETS))
+    parser.add_argument("--models", nargs="+", choices=list(ESTIMATORS), default=list(ESTIMATORS))
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--eta", type=int, default=3, help="halving factor")
+    parser.add_argument("--grid", action="store_true", help="evaluate all candidates on all rows")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    for model_name in args.models:
+        min_samples = len(training_split(args.dataset)[1]) if args.grid else None
+        start = time.perf_counter()
+        results = successive_halving(args.dataset, model_name, parameter_grid(model_name), args.folds, args.eta,
+                                     min_samples, args.workers)
+        print(f"Search took {time.perf_counter() - start:.2f} s")
+        for title, ranked in (("accuracy", results),
+                              ("accuracy per training second",
+                               sorted(results, key=lambda result: -result["accuracy_per_second"]))):
+            print(f"\nBest {model_name} by {title}:")
+            print(f"{'accuracy':>9} {'fit [ms]':>9} {'acc/s':>9}  params")
+            for result in ranked[:args.top]:
+                print(f"{result['accuracy']:>9.3f} {result['fit_seconds'] * 1000:>9.2f} "
+                      f"{result['accuracy_per_second']:>9.2f}  {result['params']}")
+        print()
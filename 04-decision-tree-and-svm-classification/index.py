@@ -1,38 +1,63 @@
-
-from datasets import load_pima_indian_dataset, load_titanic_dataset, load_survey_dataset
+import sys
+from datasets import (load_pima_indian_dataset, load_titanic_dataset, load_survey_dataset,
+                      PIMA_INDIANS_PATH, TITANIC_PATH, SURVEY_PATH)
 from models import get_decision_tree_model, get_svm_model
+from model_cache import dataset_hash, cache_report
+from reports import ReportWriter
 from classifiers import invoke_classifiers_with_survey_data, invoke_classifiers_with_titanic_data, invoke_classifiers_with_pima_indians_data
 
-def handle_survey():
+def handle_survey(retrain=False, writer=None):
     """
     Orchestrates the process of training and evaluating models
     on the job satisfaction survey dataset.
     """
     X, y = load_survey_dataset()
-    decision_tree_model = get_decision_tree_model(X, y)
-    svm_model = get_svm_model(X, y)
-    invoke_classifiers_with_survey_data(decision_tree_model, svm_model)
+    dataset = dataset_hash(load_survey_dataset, SURVEY_PATH)
+    report = writer.dataset("survey") if writer else None
+    decision_tree_model = get_decision_tree_model(X, y, dataset, retrain, report)
+    svm_model = get_svm_model(X, y, dataset, retrain, report)
+    invoke_classifiers_with_survey_data(svm_model=svm_model, decision_tree_model=decision_tree_model)
 
-def handle_diabetis():
+def handle_diabetis(retrain=False, writer=None):
     """
     Orchestrates the process of training and evaluating models
     on the diabetis dataset.
     """
     X, y = load_pima_indian_dataset()
-    decision_tree_model = get_decision_tree_model(X, y)
-    svm_model = get_svm_model(X, y)
-    invoke_classifiers_with_pima_indians_data(decision_tree_model, svm_model)
+    dataset = dataset_hash(load_pima_indian_dataset, PIMA_INDIANS_PATH)
+    report = writer.dataset("diabetis") if writer else None
+    decision_tree_model = get_decision_tree_model(X, y, dataset, retrain, report)
+    svm_model = get_svm_model(X, y, dataset, retrain, report)
+    invoke_classifiers_with_pima_indians_data(svm_model=svm_model, decision_tree_model=decision_tree_model)
 
-def handle_titanic():
+def handle_titanic(retrain=False, writer=None):
     """
     Orchestrates the process of training and evaluating models
     on the titanic dataset.
     """
     X, y = load_titanic_dataset()
-    decision_tree_model = get_decision_tree_model(X, y)
-    svm_model = get_svm_model(X, y)
-    invoke_classifiers_with_titanic_data(decision_tree_model, svm_model)
+    dataset = dataset_hash(load_titanic_dataset, TITANIC_PATH)
+    report = writer.dataset("titanic") if writer else None
+    decision_tree_model = get_decision_tree_model(X, y, dataset, retrain, report)
+    svm_model = get_svm_model(X, y, dataset, retrain, report)
+    invoke_classifiers_with_titanic_data(svm_model=svm_model, decision_tree_model=decision_tree_model)
+
+def main():
+    """
+    Trains and evaluates the models on all datasets. `--retrain` trains
+    models even if they are cached, `--report[=DIR]` writes evaluation to
+    report files instead of showing it.
+    """
+    retrain = "--retrain" in sys.argv
+    report_dir = next((argument.split("=", 1)[1] for argument in sys.argv if argument.startswith("--report=")),
+                      "reports" if "--report" in sys.argv else None)
+    writer = ReportWriter(report_dir) if report_dir else None
+    handle_survey(retrain, writer)
+    handle_diabetis(retrain, writer)
+    handle_titanic(retrain, writer)
+    print(cache_report())
+    if writer:
+        print(f"Report written to {writer.close()}")
 
-handle_survey()
-handle_diabetis()
-handle_titanic()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import hashlib
+import inspect
+import json
+import os
+import time
+import joblib
+
+# Bump when the way models are trained changes (e.g. train/test split), so old artifacts are retrained
+ARTIFACT_VERSION = 1
+CACHE_DIR = os.getenv('MODEL_CACHE_DIR', 'cache/models')
+
+stats = {'hits': 0, 'misses': 0, 'saved_seconds': 0.0, 'fit_seconds': 0.0}
+
+
+def dataset_hash(loader, path):
+    """
+    Computes hash identifying preprocessed dataset - content of the dataset
+    file together with source code of the whole module of the loader
+    (`datasets.py`), so changes of the loader and of module-level constants
+    and helpers it uses (e.g. column lists) both invalidate the caches.
+
+    Parameters:
+    loader : callable
+        Function loading and preprocessing the dataset.
+    path : str
+        Path to the dataset file.
+
+    Returns:
+    str
+        Hexadecimal SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    digest.update(inspect.getsource(inspect.getmodule(inspect.unwrap(loader))).encode())
+    return digest.hexdigest()
+
+
+def artifact_key(model, dataset, columns):
+    """
+    Builds key of the trained model from the dataset hash, estimator class,
+    its hyperparameters and training columns.
+    """
+    description = json.dumps({
+        'version': ARTIFACT_VERSION,
+        'dataset': dataset,
+        'estimator': type(model).__name__,
+        'params': {name: repr(value) for name, value in model.get_params().items()},
+        'columns': [str(column) for column in columns]
+    }, sort_keys=True)
+    return hashlib.sha256(description.encode()).hexdigest()[:32]
+
+
+def fit_cached(model, X_train, y_train, dataset=None, retrain=False):
+    """
+    Fits the model or loads the model trained before on the same dataset with
+    the same hyperparameters.
+
+    Trained models are stored in `CACHE_DIR` together with their training
+    time. Time of training skipped thanks to the cache is counted in `stats`.
+
+    Parameters:
+    model : sklearn estimator
+        Unfitted estimator with hyperparameters set.
+    X_train : pandas.DataFrame
+        Training features.
+    y_train : pandas.Series
+        Training target.
+    dataset : str, default=None
+        Hash of the dataset (see `dataset_hash`), without it the model is
+        always fitted.
+    retrain : bool, default=False
+        Fit the model even if it is in the cache and replace the cached one.
+
+    Returns:
+    sklearn estimator
+        Fitted estimator.
+    """
+    path = None
+    if dataset is not None:
+        path = os.path.join(CACHE_DIR, f"{artifact_key(model, dataset, X_train.columns)}.joblib")
+        if not retrain and os.path.exists(path):
+            try:
+                start = time.perf_counter()
+                artifact = joblib.load(path)
+                if artifact['version'] == ARTIFACT_VERSION:
+                    stats['hits'] += 1
+                    stats['saved_seconds'] += artifact['fit_seconds'] - (time.perf_counter() - start)
+                    return artifact['model']
+            except Exception as e:
+                print(f"Error loading model artifact {path}: {e}")
+
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    stats['misses'] += 1
+    stats['fit_seconds'] += fit_seconds
+    if path is not None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump({'version': ARTIFACT_VERSION, 'model': model, 'fit_seconds': fit_seconds}, temporary_path)
+        os.replace(temporary_path, path)
+    return model
+
+
+def cache_report():
+    """
+    Returns summary of the model cache usage in this run.
+    """
+    return (f"Model cache: {stats['hits']} loaded, {stats['misses']} trained "
+            f"({stats['fit_seconds']:.3f} s of training), {stats['saved_seconds']:.3f} s saved")
@@ -1,78 +1,210 @@
 import sys
+import time
 import matplotlib.pyplot as plt
 from sklearn.model_selection import train_test_split
 from sklearn.tree import DecisionTreeClassifier, plot_tree
 from sklearn.svm import SVC
+from sklearn.linear_model import SGDClassifier
+from sklearn.kernel_approximation import Nystroem, RBFSampler
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 from sklearn.impute import SimpleImputer
 import seaborn as sns
+from model_cache import fit_cached
 
-def create_svm_model():
+SVM_MODES = ("exact", "scaled", "nystroem", "fourier")
+# Number of features of the kernel approximation in "nystroem" and "fourier" modes
+APPROXIMATION_COMPONENTS = 300
+
+def create_svm_model(kernel=None, mode=None):
     """
     Creates an SVM (Support Vector Machine) model with a kernel specified via command-line arguments.
 
     The function performs the following:
-    1. Checks if a kernel type is provided as a command-line argument (`sys.argv[1]`).
+    1. Uses `kernel` if given, otherwise checks if a kernel type is provided as a command-line argument
+       (first argument not starting with "--").
     - If a kernel is specified, it uses that kernel and prints the chosen kernel type.
     - If no kernel is provided, defaults to the 'linear' kernel and prints a default notification.
-    2. Returns an instance of the `SVC` classifier with the selected kernel and a fixed random state.
+    2. Uses `mode` if given, otherwise reads it from the `--svm-mode=MODE` command-line argument
+       ("exact" by default).
+    3. Returns the SVM of the selected mode:
+    - "exact": `SVC` with the selected kernel and a fixed random state, trained on unscaled features.
+    - "scaled": the same `SVC` with features standardised by `StandardScaler`.
+    - "nystroem": standardised features mapped by `Nystroem` approximation of the kernel and linear SVM
+      trained by `SGDClassifier` (hinge loss) - training time grows linearly with rows, so it scales
+      to millions of rows.
+    - "fourier": the same with random Fourier features (`RBFSampler`, approximates the rbf kernel, so
+      only the rbf kernel is accepted) instead of `Nystroem`.
+    With the linear kernel the approximation is skipped in "nystroem" mode.
+
+    Parameters:
+    kernel : str, default=None
+        Kernel of the SVM, read from command-line arguments when not given.
+    mode : str, default=None
+        One of `SVM_MODES`, read from command-line arguments when not given.
+
     Returns:
-    svm_model : sklearn.svm.SVC
+    svm_model : sklearn.svm.SVC or sklearn.pipeline.Pipeline
         An SVM classifier initialized with the specified or default kernel.
     """
-    kernel = "linear"
-    if len(sys.argv) > 1:
-        kernel = sys.argv[1]
-        print(f"Using: {kernel} kernel")
+    if kernel is None:
+        kernel = "linear"
+        arguments = [argument for argument in sys.argv[1:] if not argument.startswith("--")]
+        if arguments:
+            kernel = arguments[0]
+            print(f"Using: {kernel} kernel")
+        else:
+            print("No metric provided, linear")
+    if mode is None:
+        mode = next((argument.split("=", 1)[1] for argument in sys.argv if argument.startswith("--svm-mode=")),
+                    "exact")
+    if mode not in SVM_MODES:
+        raise ValueError(f"Unknown SVM mode {mode}, expected one of {SVM_MODES}")
+    if mode == "fourier" and kernel != "rbf":
+        raise ValueError(f"SVM mode fourier approximates the rbf kernel, got {kernel} kernel")
+
+    if mode == "exact":
+        return SVC(kernel=kernel, random_state=42)
+    if mode == "scaled":
+        return make_pipeline(StandardScaler(), SVC(kernel=kernel, random_state=42))
+    if mode == "nystroem" and kernel == "linear":
+        return make_pipeline(StandardScaler(), SGDClassifier(loss="hinge", random_state=42))
+    if mode == "nystroem":
+        approximation = Nystroem(kernel=kernel, n_components=APPROXIMATION_COMPONENTS, random_state=42)
     else:
-        print("No metric provided, linear")
-    return SVC(kernel=kernel, random_state=42)
+        approximation = RBFSampler(gamma="scale", n_components=APPROXIMATION_COMPONENTS, random_state=42)
+    return make_pipeline(StandardScaler(), approximation, SGDClassifier(loss="hinge", random_state=42))
+
+def create_decision_tree_model():
+    """
+    Creates a decision tree classifier with a maximum depth of 4 and a fixed random state.
+    """
+    return DecisionTreeClassifier(max_depth=4, random_state=42)
+
+def train_models(X, y, dataset=None, retrain=False, kernel=None, svm_mode=None):
+    """
+    Trains (or loads from the model cache) the decision tree and the SVM on the same training split as
+    `get_decision_tree_model` and `get_svm_model`, without evaluating them.
+
+    Parameters:
+    X : pandas.DataFrame
+        Feature set.
+    y : pandas.Series
+        Target variable.
+    dataset : str, default=None
+        Hash of the dataset (see `dataset_hash`) used as key of the model cache.
+    retrain : bool, default=False
+        Train the models even if they are in the cache.
+    kernel : str, default=None
+        Kernel of the SVM, read from command-line arguments when not given.
+    svm_mode : str, default=None
+        Mode of the SVM (see `create_svm_model`), read from command-line arguments when not given.
+
+    Returns:
+    dict
+        Trained models, "decision_tree" and "svm".
+    """
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    return {
+        "decision_tree": fit_cached(create_decision_tree_model(), X_train, y_train, dataset, retrain),
+        "svm": fit_cached(create_svm_model(kernel, svm_mode), X_train, y_train, dataset, retrain)
+    }
+
+def evaluate_model(model, X, y, dataset=None, retrain=False):
+    """
+    Trains (or loads from the model cache) the model on the training split and evaluates it on the test split.
+    Shared by `get_decision_tree_model`, `get_svm_model` and `parallel_runner.py`, so all of them use the same
+    split and metrics.
+
+    Parameters:
+    model : sklearn estimator
+        Unfitted model (see `create_decision_tree_model` and `create_svm_model`).
+    X : pandas.DataFrame
+        Feature set.
+    y : pandas.Series
+        Target variable.
+    dataset : str, default=None
+        Hash of the dataset (see `dataset_hash`) used as key of the model cache,
+        without it the model is always trained.
+    retrain : bool, default=False
+        Train the model even if it is in the cache.
 
-def get_decision_tree_model(X, y):
+    Returns:
+    dict
+        Fitted model, accuracy, classification report, confusion matrix and
+        time of training (or of loading from the cache).
+    """
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    start = time.perf_counter()
+    model = fit_cached(model, X_train, y_train, dataset, retrain)
+    fit_seconds = time.perf_counter() - start
+    predicted = model.predict(X_test)
+    return {
+        "model": model,
+        "accuracy": accuracy_score(y_test, predicted),
+        "report": classification_report(y_test, predicted, zero_division=0),
+        "confusion_matrix": confusion_matrix(y_test, predicted),
+        "fit_seconds": fit_seconds
+    }
+
+def get_decision_tree_model(X, y, dataset=None, retrain=False, report=None):
     """
     Trains a decision tree classifier on the given dataset and evaluates its performance.
 
     The function performs the following steps:
     1. Splits the dataset into training and testing sets.
-    2. Trains a decision tree classifier with a maximum depth of 4 and a fixed random state for reproducibility.
+    2. Trains a decision tree classifier with a maximum depth of 4 and a fixed random state for reproducibility,
+       or loads the one trained before on the same dataset (see `fit_cached`).
     3. Predicts outcomes on the test set and evaluates the model using:
         - Accuracy score.
         - Classification report (precision, recall, F1-score).
-    4. Visualizes the decision tree.
+    4. Visualizes the decision tree - shows it in window or, in report mode, renders it to file
+       in background process.
 
     Parameters:
     X : pandas.DataFrame
         Feature set used to train the decision tree classifier.
     y : pandas.Series
         Target variable used to train the decision tree classifier.
+    dataset : str, default=None
+        Hash of the dataset (see `dataset_hash`) used as key of the model cache,
+        without it the model is always trained.
+    retrain : bool, default=False
+        Train the model even if it is in the cache.
+    report : reports.DatasetReport, default=None
+        If given, evaluation is written to report files instead of being shown.
 
     Returns:
     decision_tree_model : sklearn.tree.DecisionTreeClassifier
         The trained decision tree classifier.
     """
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-    decision_tree_model = DecisionTreeClassifier(max_depth=4, random_state=42)
-    decision_tree_model.fit(X_train, y_train)
-    dt_predicted = decision_tree_model.predict(X_test)
-    print("Decision Tree Accuracy:", accuracy_score(y_test, dt_predicted))
-    print(classification_report(y_test, dt_predicted))
+    evaluation = evaluate_model(create_decision_tree_model(), X, y, dataset, retrain)
+    decision_tree_model = evaluation["model"]
+    print("Decision Tree Accuracy:", evaluation["accuracy"])
+    print(evaluation["report"])
+    if report is not None:
+        report.classification_report("Decision Tree", evaluation["accuracy"], evaluation["report"])
+        report.tree("Decision Tree", decision_tree_model, X.columns)
+        return decision_tree_model
     plt.figure(figsize=(12, 8))
     plot_tree(decision_tree_model, feature_names=X.columns, filled=True)
     plt.show()
     return decision_tree_model
 
-def get_svm_model(X, y):
+def get_svm_model(X, y, dataset=None, retrain=False, report=None):
     """
     Trains a Support Vector Machine (SVM) classifier on the given dataset and evaluates its performance.
 
     The function performs the following steps:
     1. Splits the dataset into training and testing sets.
-    2. Trains a linear SVM model on the training set.
+    2. Trains an SVM model (see `create_svm_model`) on the training set, or loads the one trained before
+       on the same dataset with the same kernel and mode (see `fit_cached`).
     3. Predicts outcomes on the test set and evaluates the model using:
         - Accuracy score.
         - Classification report (precision, recall, F1-score).
-        - Confusion matrix, visualized as a heatmap.
+        - Confusion matrix, visualized as a heatmap (shown in window or, in report mode,
+          rendered to file in background process).
 
     Parameters:
     -----------
@@ -80,21 +212,29 @@ def get_svm_model(X, y):
         Feature set used to train the decision tree classifier.
     y : pandas.Series
         Target variable used to train the decision tree classifier.
+    dataset : str, default=None
+        Hash of the dataset (see `dataset_hash`) used as key of the model cache,
+        without it the model is always trained.
+    retrain : bool, default=False
+        Train the model even if it is in the cache.
+    report : reports.DatasetReport, default=None
+        If given, evaluation is written to report files instead of being shown.
 
     Returns:
     --------
-    svm_model : sklearn.svm.SVC
+    svm_model : sklearn.svm.SVC or sklearn.pipeline.Pipeline
         The trained SVM classifier.
     """
    
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    svm_model = create_svm_model()
-    svm_model.fit(X_train, y_train)
-    y_pred_svm = svm_model.predict(X_test)
-
-    print("SVM Accuracy:", accuracy_score(y_test, y_pred_svm))
-    print(classification_report(y_test, y_pred_svm))
-    conf_matrix = confusion_matrix(y_test, y_pred_svm)
+    evaluation = evaluate_model(create_svm_model(), X, y, dataset, retrain)
+    svm_model = evaluation["model"]
+    print("SVM Accuracy:", evaluation["accuracy"])
+    print(evaluation["report"])
+    conf_matrix = evaluation["confusion_matrix"]
+    if report is not None:
+        report.classification_report("SVM", evaluation["accuracy"], evaluation["report"])
+        report.confusion_matrix("SVM", conf_matrix)
+        return svm_model
     sns.heatmap(conf_matrix, annot=True, fmt='d', cmap='Blues')
     plt.ylabel('Actual')
     plt.xlabel('Predicted')
@@ -0,0 +1,147 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datasets import DATASETS
+from models import SVM_MODES, create_decision_tree_model, create_svm_model, evaluate_model
+from model_cache import dataset_hash
+from reports import ReportWriter
+
+MODELS = {
+    "decision_tree": ("Decision Tree", create_decision_tree_model),
+    "svm": ("SVM", create_svm_model)
+}
+
+
+def run_job(dataset_name, model_name, kernel="linear", retrain=False, svm_mode="exact"):
+    """
+    Trains (or loads from the model cache) one model on one dataset and
+    evaluates it the same way as `get_decision_tree_model` and
+    `get_svm_model` (see `evaluate_model`).
+
+    Parameters:
+    dataset_name : str
+        Name of the dataset in `DATASETS`.
+    model_name : str
+        "decision_tree" or "svm".
+    kernel : str, default="linear"
+        Kernel of the SVM.
+    retrain : bool, default=False
+        Train the model even if it is in the cache.
+    svm_mode : str, default="exact"
+        Mode of the SVM (see `create_svm_model`).
+
+    Returns:
+    dict
+        Fitted model, accuracy, classification report, confusion matrix,
+        feature names and times of training and of the whole job.
+    """
+    start = time.perf_counter()
+    spec = DATASETS[dataset_name]
+    X, y = spec['loader']()
+    model = create_svm_model(kernel, svm_mode) if model_name == "svm" else create_decision_tree_model()
+    evaluation = evaluate_model(model, X, y, dataset_hash(spec['loader'], spec['path']), retrain)
+    return {
+        "dataset": dataset_name,
+        "model_name": model_name,
+        "features": list(X.columns),
+        **evaluation,
+        "job_seconds": time.perf_counter() - start
+    }
+
+
+def run_all(jobs, workers=None, kernel="linear", retrain=False, writer=None, svm_mode="exact"):
+    """
+    Runs dataset x model jobs on process pool. Results are collected as jobs
+    finish - with `writer` their reports are written and plots are rendered
+    while the remaining jobs still run.
+
+    Parameters:
+    jobs : list of tuple
+        (dataset name, model name) pairs.
+    workers : int, default=None
+        Number of processes, number of CPUs by default. With 1 jobs run
+        sequentially in this process.
+    kernel : str, default="linear"
+        Kernel of the SVM.
+    retrain : bool, default=False
+        Train models even if they are in the cache.
+    writer : ReportWriter, default=None
+        Report the results are written to.
+    svm_mode : str, default="exact"
+        Mode of the SVM (see `create_svm_model`).
+
+    Returns:
+    list of dict
+        Results of `run_job` in the order of `jobs`.
+    """
+    results = {}
+
+    def collect(result):
+        results[(result["dataset"], result["model_name"])] = result
+        if writer is not None:
+            report = writer.dataset(result["dataset"])
+            title = MODELS[result["model_name"]][0]
+            report.classification_report(title, result["accuracy"], result["report"])
+            if result["model_name"] == "svm":
+                report.confusion_matrix(title, result["confusion_matrix"])
+            else:
+                report.tree(title, result["model"], result["features"])
+
+    if workers == 1:
+        for dataset_name, model_name in jobs:
+            collect(run_job(dataset_name, model_name, kernel, retrain, svm_mode))
+    else:
+        # SVM jobs are much longer than tree ones, starting them first shortens the wall-clock time
+        with ProcessPoolExecutor(workers) as executor:
+            futures = [executor.submit(run_job, dataset_name, model_name, kernel, retrain, svm_mode)
+                       for dataset_name, model_name in sorted(jobs, key=lambda job: job[1] != "svm")]
+            for future in as_completed(futures):
+                collect(future.result())
+    return [results[job] for job in jobs]
+
+
+if __name__ == "__main__":
+    """
+    Trains and evaluates the decision tree and the SVM on all datasets in
+    parallel, every dataset x model pair is a separate job on process pool.
+    Prints accuracy and times of every job and wall-clock time compared with
+    running the jobs one after another.
+
+    Usage:
+        python parallel_runner.py --workers 4 --kernel rbf --retrain --report
+        python parallel_runner.py --compare-sequential
+    """
+    parser = argparse.ArgumentParser(description="Parallel training of all datasets and models")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--kernel", default="linear", help="kernel of the SVM")
+    parser.add_argument("--svm-mode", choices=SVM_MODES, default="exact", help="mode of the SVM")
+    parser.add_argument("--retrain", action="store_true", help="train models even if they are cached")
+    parser.add_argument("--report", nargs="?", const="reports", help="write report files to directory")
+    parser.add_argument("--compare-sequential", action="store_true",
+                        help="run the jobs sequentially as well, implies --retrain")
+    args = parser.parse_args()
+    args.retrain = args.retrain or args.compare_sequential
+
+    jobs = [(dataset_name, model_name) for dataset_name in DATASETS for model_name in MODELS]
+    writer = ReportWriter(args.report) if args.report else None
+    start = time.perf_counter()
+    results = run_all(jobs, args.workers, args.kernel, args.retrain, writer, args.svm_mode)
+    parallel_seconds = time.perf_counter() - start
+
+    print(f"{'dataset':>10} {'model':>14} {'accuracy':>9} {'fit [s]':>9} {'job [s]':>9}")
+    for result in results:
+        print(f"{result['dataset']:>10} {result['model_name']:>14} {result['accuracy']:>9.3f} "
+              f"{result['fit_seconds']:>9.3f} {result['job_seconds']:>9.3f}")
+    jobs_seconds = sum(result["job_seconds"] for result in results)
+    print(f"\nParallel ({args.workers} workers): {parallel_seconds:.2f} s wall-clock, "
+          f"sum of jobs: {jobs_seconds:.2f} s, saved {jobs_seconds - parallel_seconds:.2f} s")
+
+    if args.compare_sequential:
+        start = time.perf_counter()
+        run_all(jobs, 1, args.kernel, args.retrain, svm_mode=args.svm_mode)
+        sequential_seconds = time.perf_counter() - start
+        print(f"Sequential: {sequential_seconds:.2f} s wall-clock, "
+              f"speedup {sequential_seconds / parallel_seconds:.2f}x")
+    if writer:
+        print(f"Report written to {writer.close()}")
@@ -0,0 +1,148 @@
+import html
+import os
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from sklearn.tree import plot_tree
+import seaborn as sns
+
+
+def render_tree(path, decision_tree_model, feature_names):
+    """
+    Renders the decision tree to image file. Uses `Figure` directly instead
+    of pyplot, so it doesn't need display and doesn't share pyplot state.
+    """
+    figure = Figure(figsize=(12, 8))
+    FigureCanvasAgg(figure)
+    plot_tree(decision_tree_model, feature_names=feature_names, filled=True, ax=figure.subplots())
+    figure.savefig(path)
+    return path
+
+
+def render_confusion_matrix(path, conf_matrix, title):
+    """
+    Renders confusion matrix as heatmap to image file.
+    """
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    ax = figure.subplots()
+    sns.heatmap(conf_matrix, annot=True, fmt='d', cmap='Blues', ax=ax)
+    ax.set_ylabel('Actual')
+    ax.set_xlabel('Predicted')
+    ax.set_title(title)
+    figure.savefig(path)
+    return path
+
+
+class ReportWriter:
+    """
+    Writes evaluation reports of the classifiers to files instead of showing
+    them in windows.
+
+    Plots are rendered by background worker processes, so training and
+    evaluation of the next model continue immediately. `close` waits for all
+    of them and writes `index.html` with all artifacts.
+
+    Parameters:
+    output_dir : str, default="reports"
+        Directory of the report files.
+    workers : int, default=1
+        Number of rendering processes.
+    """
+
+    def __init__(self, output_dir="reports", workers=1):
+        self.output_dir = output_dir
+        self.sections = {}
+        self._pending = []
+        self._executor = ProcessPoolExecutor(workers)
+        os.makedirs(output_dir, exist_ok=True)
+
+    def dataset(self, name):
+        """
+        Returns report of one dataset, artifacts of its models are grouped
+        under `name` on the index page.
+        """
+        return DatasetReport(self, name)
+
+    def add(self, section, kind, file_name, title, text=None):
+        """
+        Registers artifact ("image" or "text") on the index page.
+        """
+        self.sections.setdefault(section, []).append((kind, file_name, title, text))
+
+    def submit(self, function, *args):
+        """
+        Runs rendering function in background worker process.
+        """
+        self._pending.append(self._executor.submit(function, *args))
+
+    def close(self):
+        """
+        Waits until all plots are rendered and writes the index page.
+
+        Returns:
+        str
+            Path of the index page.
+        """
+        for future in self._pending:
+            future.result()
+        self._executor.shutdown()
+        return self._write_index()
+
+    def _write_index(self):
+        parts = ["<!DOCTYPE html>", "<html><head><meta charset=\"utf-8\"><title>Classifiers report</title></head>",
+                 "<body>", "<h1>Classifiers report</h1>"]
+        for section, artifacts in self.sections.items():
+            parts.append(f"<h2>{html.escape(section)}</h2>")
+            for kind, file_name, title, text in artifacts:
+                parts.append(f"<h3>{html.escape(title)}</h3>")
+                if kind == "image":
+                    parts.append(f"<a href=\"{file_name}\"><img src=\"{file_name}\" width=\"800\"></a>")
+                else:
+                    parts.append(f"<pre>{html.escape(text)}</pre><a href=\"{file_name}\">{file_name}</a>")
+        parts.append("</body></html>")
+        path = os.path.join(self.output_dir, "index.html")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("\n".join(parts))
+        return path
+
+
+class DatasetReport:
+    """
+    Report artifacts of models trained on one dataset (see `ReportWriter`).
+    """
+
+    def __init__(self, writer, name):
+        self.writer = writer
+        self.name = name
+
+    def tree(self, model_name, decision_tree_model, feature_names):
+        """
+        Schedules rendering of the decision tree.
+        """
+        file_name = self._file_name(model_name, "tree.png")
+        self.writer.add(self.name, "image", file_name, f"{model_name} visualisation")
+        self.writer.submit(render_tree, os.path.join(self.writer.output_dir, file_name),
+                           decision_tree_model, list(feature_names))
+
+    def confusion_matrix(self, model_name, conf_matrix):
+        """
+        Schedules rendering of the confusion matrix heatmap.
+        """
+        file_name = self._file_name(model_name, "confusion-matrix.png")
+        self.writer.add(self.name, "image", file_name, f"{model_name} confusion matrix")
+        self.writer.submit(render_confusion_matrix, os.path.join(self.writer.output_dir, file_name),
+                           conf_matrix, f"{model_name} Confusion Matrix")
+
+    def classification_report(self, model_name, accuracy, report):
+        """
+        Writes accuracy and classification report to text file.
+        """
+        file_name = self._file_name(model_name, "classification-report.txt")
+        text = f"{model_name} Accuracy: {accuracy}\n{report}"
+        with open(os.path.join(self.writer.output_dir, file_name), "w", encoding="utf-8") as file:
+            file.write(text)
+        self.writer.add(self.name, "text", file_name, f"{model_name} classification report", text)
+
+    def _file_name(self, model_name, suffix):
+        return f"{self.name}-{model_name.lower().replace(' ', '-')}-{suffix}"
@@ -0,0 +1,281 @@
+import argparse
+import copy
+import resource
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.naive_bayes import GaussianNB
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from classifiers import RecordSchema
+from datasets import DATASETS
+
+# Estimators supporting `partial_fit`, "svm" is linear SVM trained by stochastic gradient descent
+ESTIMATORS = {
+    "svm": lambda: SGDClassifier(loss="hinge", random_state=42),
+    "logistic_regression": lambda: SGDClassifier(loss="log_loss", random_state=42),
+    "naive_bayes": GaussianNB
+}
+# Every TEST_EVERY-th row of the file is used only for evaluation
+TEST_EVERY = 5
+# Median search (see `RankSearch`): bins of the histogram of one pass, values sorted in memory at most
+MEDIAN_BINS = 1024
+MEDIAN_EXACT = 100000
+
+
+def read_chunks(path, spec, chunk_size):
+    """
+    Reads raw CSV file of the dataset in chunks. Yields features (without the
+    dropped columns), target and mask of the test rows of every chunk.
+    """
+    for chunk in pd.read_csv(path, names=spec.get('names'), chunksize=chunk_size):
+        chunk = chunk.drop(columns=spec.get('drop', []))
+        test = chunk.index.to_numpy() % TEST_EVERY == 0
+        yield chunk.drop(columns=spec['target']), chunk[spec['target']], test
+
+
+def training_chunks(path, spec, chunk_size):
+    """
+    Reads training rows of the file in chunks, with categories of the mapped
+    columns converted to numbers and zeros of `zero_as_missing` columns
+    replaced by missing values, as `datasets.py` does before computing
+    medians. Yields features and target of every chunk.
+    """
+    mappings = spec.get('mappings', {})
+    zero_as_missing = spec.get('zero_as_missing', [])
+    for X, y, test in read_chunks(path, spec, chunk_size):
+        X, y = X[~test].copy(), y[~test]
+        for column in X.columns:
+            if column in mappings and not pd.api.types.is_numeric_dtype(X[column]):
+                X[column] = X[column].map(mappings[column])
+            if column in zero_as_missing:
+                X[column] = X[column].replace(0, np.nan)
+        yield X, y
+
+
+class RankSearch:
+    """
+    Finds value of the given rank (position in sorted order) among values read
+    in several passes, in memory independent of number of the values.
+
+    Every pass counts values lower than the range known to contain the rank
+    and builds histogram of `MEDIAN_BINS` bins over the range, the next pass
+    reads only the bin containing the rank. The first range is unbounded, so
+    the first pass can be run before the rank is known (e.g. to count the
+    values). Values of the range are also kept while there are at most
+    `MEDIAN_EXACT` of them, then the value is found exactly by sorting them.
+    Missing values are ignored.
+
+    Attributes:
+    rank : int
+        Position of the searched value in sorted order, starting from 0.
+    value : float
+        Value of the rank, None until found.
+    """
+
+    def __init__(self):
+        self.rank = None
+        self.value = None
+        self.edges = np.array([-np.inf, np.inf])
+        self._reset()
+
+    def _reset(self):
+        self.below = 0
+        self.histogram = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.low, self.high = np.inf, -np.inf
+        self.kept, self.kept_count = [], 0
+
+    def count(self):
+        """
+        Returns number of values from the start of the current pass.
+        """
+        return self.below + int(self.histogram.sum())
+
+    def add(self, values):
+        """
+        Counts next values of the current pass.
+        """
+        values = np.asarray(values, dtype=float)
+        self.below += int(np.count_nonzero(values < self.edges[0]))
+        values = values[(values >= self.edges[0]) & (values < self.edges[-1])]
+        if not len(values):
+            return
+        self.histogram += np.bincount(np.searchsorted(self.edges, values, side='right') - 1,
+                                      minlength=len(self.histogram))
+        self.low, self.high = min(self.low, values.min()), max(self.high, values.max())
+        if self.kept is not None:
+            self.kept.append(values)
+            self.kept_count += len(values)
+            if self.kept_count > MEDIAN_EXACT:
+                self.kept = None
+
+    def finish_pass(self):
+        """
+        Finds the value or narrows the range for the next pass, `rank` has to
+        be set.
+
+        Returns:
+        bool
+            True when the value is found.
+        """
+        position = self.rank - self.below
+        if self.kept is not None:
+            self.value = float(np.partition(np.concatenate(self.kept), position)[position])
+        elif self.low == self.high:
+            self.value = float(self.low)
+        else:
+            index = np.searchsorted(np.cumsum(self.histogram), position, side='right')
+            # tighten the bin to the values seen, the first range is unbounded
+            low = max(self.edges[index], self.low)
+            high = min(self.edges[index + 1], np.nextafter(self.high, np.inf))
+            self.edges = np.linspace(low, high, MEDIAN_BINS + 1)
+        self._reset()
+        return self.value is not None
+
+
+def learn_schema(path, spec, chunk_size):
+    """
+    Learns statistics used by the preprocessing of `datasets.py` from the
+    training rows: medians of numeric columns (zeros excluded in
+    `zero_as_missing` columns), modes and categories of one-hot encoded
+    columns and classes of the target. Categories are kept as value counts,
+    medians are found by `RankSearch` - usually one or two more passes over
+    the file, memory doesn't grow with number of rows.
+
+    Returns:
+    tuple
+        `RecordSchema` converting raw chunks to features and array of classes.
+    """
+    dummies = spec.get('dummies', [])
+    counts = {}
+    searches = {}
+    classes = set()
+    columns = None
+    for X, y in training_chunks(path, spec, chunk_size):
+        columns = list(X.columns)
+        classes.update(y.unique().tolist())
+        for column in columns:
+            if column in dummies:
+                counts[column] = counts.get(column, pd.Series(dtype=float)).add(X[column].value_counts(),
+                                                                                fill_value=0)
+            else:
+                searches.setdefault(column, RankSearch()).add(X[column])
+
+    # median is the mean of the two middle values, the same search for odd number of values
+    middles = {}
+    for column, search in searches.items():
+        total = search.count()
+        middles[column] = [search] if total % 2 else [search, copy.deepcopy(search)]
+        for middle, rank in zip(middles[column], ((total - 1) // 2, total // 2)):
+            middle.rank = rank
+    pending = [(column, middle) for column in middles for middle in middles[column] if middle.count()]
+    pending = [(column, middle) for column, middle in pending if not middle.finish_pass()]
+    while pending:
+        for X, _ in training_chunks(path, spec, chunk_size):
+            for column, middle in pending:
+                middle.add(X[column])
+        pending = [(column, middle) for column, middle in pending if not middle.finish_pass()]
+
+    fill_values = {}
+    features = []
+    for column in columns:
+        if column in dummies:
+            fill_values[column] = counts[column].idxmax()
+            features += [f"{column}_{category}" for category in sorted(counts[column].index)]
+        else:
+            values = [middle.value for middle in middles[column]]
+            fill_values[column] = np.mean(values) if None not in values else np.nan
+            features.append(column)
+    return RecordSchema(features, spec.get('mappings', {}), dummies, spec.get('zero_as_missing', []),
+                        fill_values), np.array(sorted(classes))
+
+
+def train_streaming(dataset_name, path=None, estimator="svm", chunk_size=100000, epochs=1):
+    """
+    Trains model on CSV file which doesn't have to fit in memory. The file is
+    read in chunks in several passes:
+    1. statistics of the preprocessing are learned (see `learn_schema`, one
+       or more passes),
+    2. `StandardScaler` is fitted on the preprocessed training rows (not for naive Bayes),
+    3. the estimator is trained by `partial_fit` on every chunk, `epochs` times,
+    4. the model is evaluated on the test rows (every `TEST_EVERY`-th row).
+    Only one chunk is in memory at a time.
+
+    Parameters:
+    dataset_name : str
+        Name of the dataset in `DATASETS`, defines layout and preprocessing of the file.
+    path : str, default=None
+        CSV file, file of the dataset by default.
+    estimator : str, default="svm"
+        Name of the estimator in `ESTIMATORS`.
+    chunk_size : int, default=100000
+        Number of rows read at once.
+    epochs : int, default=1
+        Number of training passes.
+
+    Returns:
+    tuple
+        Trained pipeline (predicts arrays of features), `RecordSchema` of raw records and test accuracy.
+    """
+    spec = DATASETS[dataset_name]
+    path = path or spec['path']
+    schema, classes = learn_schema(path, spec, chunk_size)
+
+    scaler = None
+    if estimator != "naive_bayes":
+        scaler = StandardScaler()
+        for X, y, test in read_chunks(path, spec, chunk_size):
+            if test.all():
+                continue
+            scaler.partial_fit(schema.transform(X[~test]).to_numpy(dtype=float))
+    model = ESTIMATORS[estimator]()
+    pipeline = make_pipeline(scaler, model) if scaler is not None else make_pipeline(model)
+
+    for _ in range(epochs):
+        for X, y, test in read_chunks(path, spec, chunk_size):
+            if test.all():
+                continue
+            features = schema.transform(X[~test]).to_numpy(dtype=float)
+            if scaler is not None:
+                features = scaler.transform(features)
+            model.partial_fit(features, y[~test].to_numpy(), classes=classes)
+
+    correct = total = 0
+    for X, y, test in read_chunks(path, spec, chunk_size):
+        if not test.any():
+            continue
+        predicted = pipeline.predict(schema.transform(X[test]).to_numpy(dtype=float))
+        correct += int(np.sum(predicted == y[test].to_numpy()))
+        total += int(test.sum())
+    return pipeline, schema, correct / total
+
+
+if __name__ == "__main__":
+    """
+    Out-of-core training on CSV file of one of the datasets (e.g. large
+    survey export), memory use depends on the chunk size, not on the file
+    size. Prints test accuracy, time and peak memory of the process.
+
+    Usage:
+        python streaming_training.py titanic --input passengers.csv --estimator svm --chunk-size 100000
+        python streaming_training.py survey --input export.csv --output survey-model.joblib
+    """
+    parser = argparse.ArgumentParser(description="Out-of-core training")
+    parser.add_argument("dataset", choices=list(DATASETS))
+    parser.add_argument("--input", help="CSV file, file of the dataset by default")
+    parser.add_argument("--estimator", choices=list(ESTIMATORS), default="svm")
+    parser.add_argument("--chunk-size", type=int, default=100000)
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--output", help="save the model and the schema with joblib")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    pipeline, schema, accuracy = train_streaming(args.dataset, args.input, args.estimator, args.chunk_size,
+                                                 args.epochs)
+    print(f"Test accuracy: {accuracy:.3f}, trained in {time.perf_counter() - start:.2f} s, "
+          f"peak memory {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+    if args.output:
+        joblib.dump({'model': pipeline, 'schema': schema}, args.output)
+        print(f"Model written to {args.output}")